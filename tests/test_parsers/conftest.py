@@ -42,3 +42,95 @@ def rushydro_informer():
         </div>
     </div>
     """
+
+
+@pytest.fixture
+def ebvu_month():
+    return """
+    <div class="iul_day_1" id="iul_day_1">
+        <p>Саяно-Шушенская ГЭС: верхний бьеф 535,12 м, расход 2540 м³/с</p>
+        <p>приток 2620 м³/с</p>
+        <p>холостой сброс 0 м³/с</p>
+        <p>Майнская ГЭС: верхний бьеф 322,40 м, расход 2630 м³/с</p>
+        <p>холостой сброс 0 м³/с</p>
+        <p>Красноярская ГЭС: верхний бьеф 241,05 м, расход 2800 м³/с</p>
+        <p>приток общий 3050 м³/с</p>
+        <p>холостой сброс 10 м³/с</p>
+    </div>
+    <div class="iul_day_1" id="iul_day_2">
+        <p>Нет данных</p>
+    </div>
+    """
+
+
+@pytest.fixture
+def rp5_archive():
+    row = (
+        '<tr>{}<td class="cl"><div class="dfs">{}</div></td>'
+        '<td class="cl_t"><div class="t_0">{}</div></td>'
+        '<td class="cl"><div class="p_0">{}</div></td>'
+        '<td class="cl">{}</td><td class="cl">{}</td>'
+        '<td class="cl"><div class="wv_0">{}</div></td>'
+        '<td class="cl">{}</td></tr>'
+    )
+    rows = ''.join([
+        row.format(
+            '<td class="cl_dt" rowspan="3">16.01.2023</td>',
+            21, '-5.2', '750.1', 80, '100%.', 2, '0.3',
+        ),
+        row.format('', 12, '-3.0', '751.4', 75, '70 – 80%.', 3, ''),
+        row.format('', 3, '-8.1', '752.0', 82, 'Облаков нет.', 1, '0.0'),
+        row.format(
+            '<td class="cl_dt" rowspan="2">15.01.2023</td>',
+            21, '-9.4', '749.9', 85, '100%.', 0, 'Осадков нет',
+        ),
+        row.format('', 0, '-10.0', '749.2', 88, '90  или более', 2, '1'),
+    ])
+    return f"""
+    <html>
+    <body>
+        <div id="header"><table><tr><td>rp5.ru</td></tr></table></div>
+        <div class="archive">
+            <table id="archiveTable" class="archiveTable"><tbody><tr>
+                <td class="cl_hd">Дата / Местное время</td>
+                <td class="cl_hd">Время</td><td class="cl_hd">T</td>
+                <td class="cl_hd">Po</td><td class="cl_hd">U</td>
+                <td class="cl_hd">N</td><td class="cl_hd">Ff</td>
+                <td class="cl_hd">RRR</td></tr>
+                {rows}
+            </tbody></table>
+        </div>
+        <table><tbody><tr><td>footer</td></tr></tbody></table>
+    </body>
+    </html>
+    """
+
+
+@pytest.fixture
+def roshydromet_forecast():
+    return """
+    <html>
+    <body>
+        <div class="menu"><a href="/">Росгидромет</a></div>
+        <table class="table-forecast">
+            <tbody>
+                <tr>
+                    <td><div class="date">Сегодня</div>
+                    <div class="small">днем</div></td>
+                    <td>-5</td> <td>750</td> <td>0</td> <td>80</td> <td>3</td>
+                </tr>
+                <tr>
+                    <td><div class="small">ночью</div></td>
+                    <td>-12</td> <td>752</td> <td>1</td> <td>40</td>
+                    <td>штиль</td>
+                </tr>
+                <tr>
+                    <td><div class="date">17 января</div>
+                    <div class="small">днем</div></td>
+                    <td>-7</td> <td>748</td> <td>2</td> <td>100</td> <td>5</td>
+                </tr>
+            </tbody>
+        </table>
+    </body>
+    </html>
+    """
@@ -1,8 +1,14 @@
+import datetime as dt
+import logging
+
+import numpy as np
 import pytest
 
 
 from reservoirs.models import Reservoir
-from services.parsers import RushydroParser
+from services.parsers import (EBVU_PARSERS, EbvuParser, RoshydrometParser,
+                              RP5Parser, RushydroParser)
+from services.writers import UpsertWriter
 
 
 @pytest.mark.parametrize(
@@ -39,3 +45,167 @@ def test_rushydro_parser(name, rushydro_informer):
     reservoir = Reservoir(station_name=name, name=name)
     parser = RushydroParser()
     assert parser.parse(page=rushydro_informer, reservoir=reservoir)
+
+
+def test_rushydro_parser_parse_all(rushydro_informer):
+    parser = RushydroParser()
+    situations = parser.parse_all(page=rushydro_informer)
+    assert len(situations) == 25
+
+    for name, series in situations.items():
+        reservoir = Reservoir(station_name=name, name=name)
+        assert series
+        assert series == parser.parse(
+            page=rushydro_informer, reservoir=reservoir
+        )
+
+
+PARSE_CALLS = {
+    'rushydro_informer': (RushydroParser, RushydroParser.parse_all),
+    'ebvu_month': (EbvuParser, lambda page: {
+        slug: parser.parse_month(page, EBVU_DATES)
+        for slug, parser in EBVU_PARSERS.items()
+    }),
+    'rp5_archive': (RP5Parser, RP5Parser.parse),
+    'roshydromet_forecast': (RoshydrometParser, lambda page: (
+        RoshydrometParser.parse(page, today=dt.date(2023, 1, 16))
+    )),
+}
+EBVU_DATES = [dt.date(2023, 5, 1), dt.date(2023, 5, 2), dt.date(2023, 5, 3)]
+
+
+@pytest.mark.parametrize('features', ['html.parser', 'lxml'])
+@pytest.mark.parametrize('strained', [False, True])
+@pytest.mark.parametrize('fixture', list(PARSE_CALLS))
+def test_parser_backends(fixture, strained, features, request, monkeypatch):
+    page = request.getfixturevalue(fixture)
+    parser, parse = PARSE_CALLS[fixture]
+    parse_only = parser.parse_only
+
+    monkeypatch.setattr(parser, 'features', 'html.parser')
+    monkeypatch.setattr(parser, 'parse_only', None)
+    expected = parse(page)
+    assert expected
+
+    monkeypatch.setattr(parser, 'features', features)
+    monkeypatch.setattr(parser, 'parse_only', parse_only if strained else None)
+    assert parse(page) == expected
+
+
+@pytest.mark.parametrize(
+    'slug, expected',
+    [
+        ('kras', {'level': 241.05, 'inflow': 3050,
+                  'outflow': 2800, 'spillway': 10}),
+        ('sayano', {'level': 535.12, 'inflow': 2620,
+                    'outflow': 2540, 'spillway': 0}),
+    ]
+)
+def test_ebvu_parser(slug, expected, ebvu_month):
+    date = dt.date(2023, 5, 1)
+    situation = EBVU_PARSERS[slug].parse(page=ebvu_month, date=date)
+    assert situation.dict(exclude_none=True) == {'date': date, **expected}
+
+
+def test_ebvu_parser_logs_slug(ebvu_month, caplog):
+    with caplog.at_level(logging.INFO):
+        EBVU_PARSERS['kras'].parse(page=ebvu_month, date=dt.date(2023, 5, 2))
+    assert 'EbvuParser kras No data' in caplog.text
+
+
+def test_ebvu_parser_patterns_per_instance():
+    patterns = [parser.patterns for parser in EBVU_PARSERS.values()]
+    assert len({id(pattern) for pattern in patterns}) == len(patterns)
+    assert 'приток общий' not in EBVU_PARSERS['sayano'].patterns
+
+
+def test_ebvu_parser_no_data(ebvu_month):
+    parser = EBVU_PARSERS['kras']
+    dates = [dt.date(2023, 5, 1), dt.date(2023, 5, 2), dt.date(2023, 5, 3)]
+    assert len(parser.parse_month(page=ebvu_month, dates=dates)) == 1
+
+
+def test_rushydro_parser_columns(rushydro_informer):
+    situations = RushydroParser.parse_all(page=rushydro_informer)
+    columns = RushydroParser.parse_columns(page=rushydro_informer)
+    assert columns.keys() == situations.keys()
+
+    for name, series in situations.items():
+        rows = [
+            dict(zip(columns[name], row)) for row in zip(*(
+                UpsertWriter.to_python(column)
+                for column in columns[name].values()
+            ))
+        ]
+        assert rows == [situation.dict() for situation in series]
+
+
+def test_rushydro_parser_columns_fallback():
+    page = """
+    <div data-river="Все реки">
+        <option water-date="09.04,10.04" water-level="207.06,нет"
+            water-polemk="1,2" water-pritok="3,4" water-rashod="5,нет"
+            water-sbros="0,0">Богучанская</option>
+        <option water-date="09.04,10.04" water-level="207.06,207.1"
+            water-polemk="1,2" water-pritok="3,4" water-rashod="5,нет"
+            water-sbros="0,0">Братская</option>
+    </div>
+    """
+    columns = RushydroParser.parse_columns(page=page)
+    assert list(columns) == ['Братская']
+    assert np.isnan(columns['Братская']['outflow'][0])
+
+
+def test_rushydro_parser_fallback_uses_page_date():
+    page = """
+    <div data-river="Все реки">
+        <option water-date="30.12.2020,31.12,01.01"
+            water-level="207.0,207.06,207.1" water-polemk="1,1,2"
+            water-pritok="3,3,4" water-rashod="5,5,6"
+            water-sbros="0,0,0">Братская</option>
+    </div>
+    """
+    columns = RushydroParser.parse_columns(page, today=dt.date(2021, 1, 1))
+    assert columns['Братская']['date'].tolist() == [
+        dt.date(2021, 1, 1), dt.date(2020, 12, 31), dt.date(2020, 12, 30)
+    ]
+
+
+def test_rp5_parser_multi_day_table():
+    row = (
+        '<tr>{}<td><div class="dfs">{}</div></td>'
+        '<td>-5</td><td>750</td><td>80</td><td>100%</td>'
+        '<td>2</td><td>0.3</td></tr>'
+    )
+    page = (
+        '<table id="archiveTable"><tbody>'
+        '<tr><td>Дата</td><td>Время</td><td>T</td><td>Po</td><td>U</td>'
+        '<td>N</td><td>Ff</td><td>RRR</td></tr>'
+        + row.format('<td class="cl_dt">16.01.2023</td>', 12)
+        + row.format('', 0)
+        + row.format('<td class="cl_dt">15.01.2023</td>', 21)
+        + row.format('', 3)
+        + row.format('', 18)
+        + '</tbody></table>'
+    )
+    observations = RP5Parser.parse(page)
+    assert [observation.date for observation in observations] == [
+        dt.datetime(2023, 1, 16, 12),
+        dt.datetime(2023, 1, 16, 0),
+        dt.datetime(2023, 1, 15, 21),
+        dt.datetime(2023, 1, 15, 3),
+        dt.datetime(2023, 1, 14, 18),
+    ]
+    assert observations[0].pressure == 750
+
+
+def test_rp5_parser_table_without_dates():
+    page = (
+        '<table id="archiveTable"><tbody>'
+        '<tr><td>Время</td><td>T</td><td>Po</td><td>U</td>'
+        '<td>N</td><td>Ff</td><td>RRR</td></tr>'
+        '<tr><td><div class="dfs">12</div></td><td>-5</td><td>750</td>'
+        '<td>80</td><td>100%</td><td>2</td><td>0.3</td></tr>'
+        '</tbody></table>'
+    )
+    assert RP5Parser.parse(page) == []
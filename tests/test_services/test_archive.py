@@ -0,0 +1,75 @@
+import datetime as dt
+
+import pytest
+from django.core.management import call_command
+
+from reservoirs.models import Reservoir
+from services.archive import PageArchive
+from services.scrapers import RushydroScraper
+from services.writers import SituationWriter
+from tasks.management.commands.reparse import parse_archived_page
+from tasks.models import ArchivedPage
+
+
+URL = 'https://example.com/page.php'
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_page_archive_deduplicates_content(media_root):
+    archive = PageArchive('test')
+    first = archive.put(URL, '<html>1</html>', date=dt.date(2023, 1, 1))
+    second = archive.put(URL, '<html>1</html>', date=dt.date(2023, 1, 2))
+
+    assert first.content_hash == second.content_hash
+    assert ArchivedPage.objects.filter(source='test').count() == 2
+    assert len(list(media_root.rglob('*.zst'))) == 1
+    assert PageArchive.read(first.path) == '<html>1</html>'
+
+
+@pytest.mark.django_db
+def test_parse_archived_page(media_root):
+    page = PageArchive('RoshydrometScraper').put(URL, '<html></html>')
+    result = parse_archived_page(
+        'RoshydrometScraper', page.path, page.date, None
+    )
+    assert result == []
+
+
+class RecordingWriter(SituationWriter):
+    written: list[tuple] = []
+
+    def write_columns(self, block):
+        self.written.extend(zip(block['date'], block['reservoir_id']))
+        return [(True, target) for target in block['reservoir_id']]
+
+
+@pytest.mark.django_db
+def test_reparse_resolves_years_from_page_date(media_root, monkeypatch):
+    reservoir = Reservoir.objects.create(
+        name='Братская', slug='bratsk', station_name='Братская'
+    )
+    page = """
+    <div data-river="Все реки">
+        <option water-date="30.12.2020,31.12,01.01"
+            water-level="207.0,207.06,207.1" water-polemk="1,1,2"
+            water-pritok="3,3,4" water-rashod="5,5,6"
+            water-sbros="0,0,0">Братская</option>
+    </div>
+    """
+    PageArchive('RushydroScraper').put(URL, page, date=dt.date(2021, 1, 1))
+    monkeypatch.setattr(RushydroScraper, 'writer_class', RecordingWriter)
+    monkeypatch.setattr(RecordingWriter, 'written', [])
+
+    call_command('reparse', 'RushydroScraper', workers=1)
+
+    assert sorted(RecordingWriter.written) == [
+        (dt.date(2020, 12, 30), reservoir.id),
+        (dt.date(2020, 12, 31), reservoir.id),
+        (dt.date(2021, 1, 1), reservoir.id),
+    ]
@@ -0,0 +1,94 @@
+import pytest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from services.browsers import DriverPool, DriverSession, Waiter
+
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise WebDriverException('session deleted')
+        return 'about:blank'
+
+    def get(self, url):
+        self.current_url
+
+    def delete_all_cookies(self):
+        self.current_url
+
+    def quit(self):
+        self.closed = True
+
+
+class FakePool(DriverPool):
+    def create(self):
+        self.created += 1
+        return DriverSession(FakeDriver())
+
+
+def test_pool_reuses_sessions():
+    pool = FakePool(size=1)
+
+    with pool.lease() as first:
+        pass
+
+    with pool.lease() as second:
+        pass
+
+    assert first is second
+    assert pool.stats()['created'] == 1
+    assert pool.stats()['idle'] == 1
+
+
+def test_pool_replaces_dead_and_expired_sessions():
+    pool = FakePool(size=1, max_uses=2)
+
+    with pool.lease() as driver:
+        driver.alive = False
+
+    with pool.lease() as replacement:
+        pass
+
+    assert replacement is not driver
+    assert driver.closed
+
+    with pool.lease():
+        pass
+
+    assert replacement.closed
+    assert pool.stats()['recycled'] == 2
+
+
+def test_pool_discards_broken_session_and_times_out():
+    pool = FakePool(size=1, lease_timeout=0.01)
+
+    with pytest.raises(WebDriverException):
+        with pool.lease() as driver:
+            raise WebDriverException('crashed')
+
+    assert driver.closed
+    assert pool.stats() == {
+        'size': 1, 'idle': 0, 'leased': 0, 'created': 1, 'recycled': 1
+    }
+
+    with pool.lease():
+        with pytest.raises(TimeoutError):
+            pool.acquire()
+
+
+def test_waiter_records_step_times():
+    waiter = Waiter(FakeDriver(), timeout=0.05, poll=0.01)
+
+    assert waiter.until('ready', lambda driver: driver.current_url)
+
+    with pytest.raises(TimeoutException):
+        waiter.until('missing', lambda driver: False)
+
+    assert len(waiter.times['ready']) == 1
+    assert waiter.times['missing'][0] >= 0.05
+    assert waiter.summary().startswith('ready: 1 waits')
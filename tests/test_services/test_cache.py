@@ -0,0 +1,59 @@
+import httpx
+import pytest
+
+from services.cache import PageCache
+from tasks.models import FetchState
+
+
+URL = 'https://example.com/page.php'
+
+
+@pytest.mark.django_db
+def test_page_cache_skips_identical_content():
+    cache = PageCache('test', [URL])
+    assert cache.is_changed(URL, '<html>1</html>')
+    cache.save()
+
+    cache = PageCache('test', [URL])
+    assert not cache.is_changed(URL, '<html>1</html>')
+    assert cache.is_changed(URL, '<html>2</html>')
+    cache.save()
+
+    state = FetchState.objects.get(url=URL)
+    assert state.fetch_count == 2
+    assert state.skip_count == 1
+
+
+@pytest.mark.django_db
+def test_page_cache_conditional_headers():
+    cache = PageCache('test', [URL])
+    response = httpx.Response(
+        200, content=b'data', headers={'ETag': '"abc"'}
+    )
+    assert cache.is_modified(URL, response)
+    cache.save()
+
+    cache = PageCache('test', [URL])
+    assert cache.get_headers(URL) == {'If-None-Match': '"abc"'}
+    assert not cache.is_modified(URL, httpx.Response(304))
+    assert cache.skipped == 1
+
+
+@pytest.mark.django_db
+def test_page_cache_keeps_one_state_per_url_for_wanted_sets():
+    cache = PageCache('test', [URL])
+    response = httpx.Response(
+        200, content=b'data', headers={'ETag': '"abc"'}
+    )
+    assert cache.is_modified(URL, response, wanted='kras:20230501')
+    cache.save()
+
+    cache = PageCache('test', [URL])
+    assert cache.get_headers(URL, wanted='bratsk:20230501') == {}
+    assert cache.is_modified(URL, response, wanted='bratsk:20230501')
+    assert not cache.is_modified(URL, response, wanted='bratsk:20230501')
+    cache.save()
+
+    state = FetchState.objects.get(url=URL)
+    assert state.wanted == 'bratsk:20230501'
+    assert state.fetch_count == 2
@@ -0,0 +1,21 @@
+from services import clients
+from services.clients import get_async_client, get_client
+
+
+def test_client_is_shared_per_process_and_verify_flag(monkeypatch):
+    monkeypatch.setattr(clients, '_clients', {})
+
+    client = get_client()
+    assert get_client() is client
+    assert get_client(verify=False) is not client
+    assert client.headers['Accept-Encoding'] == clients.ENCODINGS
+    assert client.timeout.read == clients.TIMEOUT
+
+    monkeypatch.setattr(clients, '_pid', -1)
+    assert get_client() is not client
+
+
+def test_async_client_options():
+    client = get_async_client(max_connections=4)
+    assert client.headers['Accept-Encoding'] == clients.ENCODINGS
+    assert client.follow_redirects
@@ -0,0 +1,86 @@
+import datetime as dt
+from unittest import mock
+
+from django.db import connection
+
+from services.gaps import (SituationGapFinder, WeatherGapFinder,
+                           group_by_month, group_ranges)
+
+
+def days(*numbers, month=1):
+    return [dt.date(2023, month, number) for number in numbers]
+
+
+def test_group_by_month():
+    gaps = {1: days(3, 4) + days(2, month=2), 2: days(4, 9)}
+    assert group_by_month(gaps) == {
+        dt.date(2023, 1, 1): {1: days(3, 4), 2: days(4, 9)},
+        dt.date(2023, 2, 1): {1: days(2, month=2)},
+    }
+
+
+def test_situation_gap_sql():
+    sql = SituationGapFinder.get_sql()
+
+    assert sql.startswith(
+        'WITH bounds AS (SELECT "reservoir_id" AS target, '
+        'MIN("date") AS first_day, MAX("date") AS last_day '
+        'FROM "water_situation" '
+        'WHERE "reservoir_id" = ANY(%(targets)s::int[]) AND TRUE '
+        'GROUP BY "reservoir_id") '
+    )
+    assert (
+        'SELECT generate_series('
+        'GREATEST(b.first_day, %(start)s::date), '
+        'LEAST(b.last_day, %(end)s::date), '
+        "interval '1 day')::date AS day) d "
+    ) in sql
+    assert (
+        'WHERE NOT EXISTS (SELECT 1 FROM "water_situation" f '
+        'WHERE f."reservoir_id" = b.target AND f."date" = d.day AND TRUE) '
+        'ORDER BY b.target, d.day'
+    ) in sql
+
+
+def test_weather_gap_sql_uses_local_days_of_observations():
+    sql = WeatherGapFinder.get_sql()
+
+    assert 'MIN(("date" AT TIME ZONE %(timezone)s)::date)' in sql
+    assert 'AND "is_observable" GROUP BY "geo_object_id"' in sql
+    assert (
+        'f."date" >= (d.day::timestamp AT TIME ZONE %(timezone)s) '
+        'AND f."date" < ((d.day + 1)::timestamp AT TIME ZONE %(timezone)s) '
+        'AND "is_observable")'
+    ) in sql
+
+
+def test_gap_finder_groups_rows_by_target():
+    cursor = mock.MagicMock()
+    cursor.__enter__.return_value = cursor
+    cursor.fetchall.return_value = [
+        (1, dt.date(2023, 1, 3)), (1, dt.date(2023, 1, 4)),
+        (2, dt.date(2023, 1, 9)),
+    ]
+
+    with mock.patch.object(connection, 'cursor', return_value=cursor):
+        gaps = SituationGapFinder.find(
+            [1, 2], start=dt.date(2023, 1, 1), end=dt.date(2023, 1, 31)
+        )
+
+    sql, params = cursor.execute.call_args.args
+    assert sql == SituationGapFinder.get_sql()
+    assert params == {
+        'targets': [1, 2],
+        'start': dt.date(2023, 1, 1),
+        'end': dt.date(2023, 1, 31),
+    }
+    assert gaps == {1: days(3, 4), 2: days(9)}
+
+
+def test_group_ranges():
+    assert group_ranges(days(1, 2, 3, 4, 5, 9, 10, 20), max_days=3) == [
+        (dt.date(2023, 1, 1), dt.date(2023, 1, 3)),
+        (dt.date(2023, 1, 4), dt.date(2023, 1, 5)),
+        (dt.date(2023, 1, 9), dt.date(2023, 1, 10)),
+        (dt.date(2023, 1, 20), dt.date(2023, 1, 20)),
+    ]
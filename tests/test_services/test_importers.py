@@ -0,0 +1,32 @@
+import numpy as np
+
+from services.importers import RP5ExportReader
+from services.writers import WeatherWriter
+
+
+EXPORT = '''# Метеостанция Бея
+# Выборка данных: с 15.01.2023 по 16.01.2023
+"Местное время в Бее";"T";"Po";"U";"N";"Ff";"RRR";
+"16.01.2023 03:00";"-5.2";"750.4";"80";"100%.";"2";"Осадков нет";
+"16.01.2023 00:00";"-6.0";"751.0";"";"Облаков нет.";"0";"0.3";
+"15.01.2023 21:00";"-7.1";"752.9";"75";"20–30%.";"3";"1,5";
+'''
+
+
+def test_rp5_export_reader(tmp_path):
+    path = tmp_path / 'export.csv'
+    path.write_text(EXPORT, encoding='utf-8')
+
+    chunks = list(RP5ExportReader(path, timezone='Asia/Krasnoyarsk'))
+    assert len(chunks) == 1
+
+    columns = chunks[0]
+    assert columns['date'].tolist() == [
+        np.datetime64('2023-01-15T20:00:00'),
+        np.datetime64('2023-01-15T14:00:00'),
+    ]
+    assert columns['temp'].tolist() == [-5.2, -7.1]
+    assert columns['pressure'].tolist() == [750, 752]
+    assert columns['cloudiness'].tolist() == [100, 20]
+    assert columns['precipitation'].tolist() == [0, 1.5]
+    assert WeatherWriter.to_text(columns['date'])[0] == '2023-01-15T20:00:00Z'
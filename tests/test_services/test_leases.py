@@ -0,0 +1,52 @@
+import fakeredis
+import pytest
+
+from services import leases
+from services.leases import Lease, exclusive, get_leases
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(leases, '_client', client)
+    return client
+
+
+def test_lease_is_exclusive_until_released(client):
+    first = Lease('job', ttl=10)
+    second = Lease('job', ttl=10)
+
+    assert first.acquire()
+    assert not second.acquire()
+    assert not second.release()
+    assert first.renew()
+
+    assert first.release()
+    assert second.acquire()
+
+
+def test_lease_expires_by_ttl(client):
+    lease = Lease('job', ttl=10)
+    assert lease.acquire()
+
+    client.delete(lease.key)
+    assert not lease.renew()
+    assert Lease('job', ttl=10).acquire()
+
+
+def test_exclusive_skips_and_coalesces(client):
+    calls = []
+
+    @exclusive(lambda name: f'job:{name}', coalesce=True)
+    def job(name):
+        calls.append(name)
+
+        if len(calls) == 1:
+            assert job(name) is None
+            assert get_leases()[0]['pending']
+
+        return len(calls)
+
+    assert job('a') == 2
+    assert calls == ['a', 'a']
+    assert get_leases() == []
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+
+from services.limits import RateLimiter, get_rate_limits
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis()
+
+
+def test_rate_limiter_reserves_tokens(client):
+    limiter = RateLimiter('test', rate=10, burst=2, client=client)
+
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == pytest.approx(0.1, abs=0.02)
+    assert limiter.reserve() == pytest.approx(0.2, abs=0.02)
+
+    assert limiter.get_metrics()['acquired'] == 4
+    assert limiter.get_metrics()['waited'] == 2
+    assert limiter.get_metrics()['wait_time'] == pytest.approx(0.3, abs=0.04)
+
+
+def test_rate_limiter_is_shared_between_workers(client):
+    first = RateLimiter('test', rate=1, burst=1, client=client)
+    second = RateLimiter('test', rate=1, burst=1, client=client)
+
+    assert first.acquire() == 0
+    assert second.reserve() == pytest.approx(1, abs=0.05)
+
+
+def test_rate_limiter_without_redis():
+    limiter = RateLimiter('test', rate=1, burst=1)
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0
+
+
+def test_rate_limiter_async_does_not_block_loop(client, monkeypatch):
+    limiter = RateLimiter('test', rate=10, burst=2, client=client)
+    reserve = limiter.reserve
+
+    def slow_reserve(tokens):
+        time.sleep(0.2)
+        return reserve(tokens)
+
+    monkeypatch.setattr(limiter, 'reserve', slow_reserve)
+
+    async def tick(ticks: list):
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.02)
+
+    async def main():
+        ticks = []
+        started_at = time.monotonic()
+        await asyncio.gather(limiter.acquire_async(), tick(ticks))
+        return ticks[-1] - started_at
+
+    assert asyncio.run(main()) < 0.2
+
+
+def test_rate_limits_from_env(monkeypatch):
+    monkeypatch.setenv('RATE_LIMITS', 'EbvuScraper=0.5:3, Other=2')
+    limits = get_rate_limits()
+    assert limits['EbvuScraper'] == (0.5, 3)
+    assert limits['Other'] == (2, 1)
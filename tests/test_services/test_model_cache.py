@@ -0,0 +1,82 @@
+import hashlib
+
+import pytest
+from django.core.files.base import ContentFile
+
+from predictors.models import WaterSituationPredictor
+from reservoirs.models import Reservoir
+from services.model_cache import ModelCache
+
+
+def make_cache(max_size: int) -> ModelCache:
+    return ModelCache(max_size, get_size=lambda model: model['size'])
+
+
+def test_model_cache_hits_and_reloads_on_new_version():
+    cache = make_cache(100)
+    loads = []
+
+    def loader(version):
+        def load():
+            loads.append(version)
+            return {'size': 10, 'version': version}
+        return load
+
+    first = cache.get(1, 'a', loader('a'))
+    assert cache.get(1, 'a', loader('a')) is first
+    assert cache.get(1, 'b', loader('b'))['version'] == 'b'
+
+    assert loads == ['a', 'b']
+    assert (1, 'a') not in cache
+    assert (cache.hits, cache.misses, cache.size) == (1, 2, 10)
+
+
+def test_model_cache_keeps_model_when_new_checkpoint_fails():
+    cache = make_cache(100)
+    model = cache.get(1, 'a', lambda: {'size': 10})
+
+    def broken():
+        raise ValueError('bad checkpoint')
+
+    with pytest.raises(ValueError):
+        cache.get(1, 'b', broken)
+
+    assert cache.get(1, 'a', broken) is model
+
+
+def test_model_cache_evicts_least_recently_used():
+    cache = make_cache(25)
+
+    cache.get(1, 'a', lambda: {'size': 10})
+    cache.get(2, 'a', lambda: {'size': 10})
+    cache.get(1, 'a', lambda: {'size': 10})
+    cache.get(3, 'a', lambda: {'size': 10})
+
+    assert (1, 'a') in cache and (3, 'a') in cache
+    assert (2, 'a') not in cache
+    assert cache.evictions == 1
+
+    cache.get(4, 'a', lambda: {'size': 30})
+    assert len(cache) == 2 and cache.size == 20
+
+
+@pytest.mark.django_db
+def test_predictor_hashes_uploaded_checkpoint(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    reservoir = Reservoir.objects.create(name='test', slug='test')
+    predictor = WaterSituationPredictor(name='test', reservoir=reservoir)
+    predictor.checkpoint.save('model.ckpt', ContentFile(b'first'))
+
+    assert predictor.checkpoint_hash == hashlib.sha256(b'first').hexdigest()
+
+    predictor.checkpoint = ContentFile(b'second', name='model.ckpt')
+    predictor.save()
+    predictor.refresh_from_db()
+
+    assert predictor.checkpoint_hash == hashlib.sha256(b'second').hexdigest()
+
+    predictor.name = 'renamed'
+    predictor.save()
+    predictor.refresh_from_db()
+
+    assert predictor.checkpoint_hash == hashlib.sha256(b'second').hexdigest()
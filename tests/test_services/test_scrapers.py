@@ -0,0 +1,258 @@
+import asyncio
+import datetime as dt
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from reservoirs.models import Reservoir
+from services.schemes import Situation, WeatherBase
+from services.scrapers import EbvuScraper, GismeteoScraper, RP5Scraper
+from services.writers import SituationWriter, WeatherWriter
+from tasks.models import Checkpoint
+from weather.models import GeoObject
+
+
+def test_ebvu_start_date_ignores_lagging_reservoir():
+    start_dates = {
+        'kras': dt.date(2023, 5, 10),
+        'sayano': dt.date(2023, 5, 9),
+        'bratsk': dt.date(2022, 1, 1),
+    }
+    expected = dt.date(2023, 5, 10) - dt.timedelta(EbvuScraper.max_lag_days)
+    assert EbvuScraper.get_start_date(start_dates) == expected
+
+
+def test_ebvu_start_date_keeps_full_history_for_new_reservoir():
+    start_dates = {
+        'kras': dt.date(2023, 5, 10),
+        'boguch': EbvuScraper.first_date,
+    }
+    assert EbvuScraper.get_start_date(start_dates) == EbvuScraper.first_date
+
+
+def test_ebvu_start_date_keeps_full_history_for_new_install():
+    start_dates = dict.fromkeys(['kras', 'sayano'], EbvuScraper.first_date)
+    assert EbvuScraper.get_start_date(start_dates) == EbvuScraper.first_date
+
+
+def test_ebvu_wanted_tracks_reservoirs_needing_month():
+    dates = EbvuScraper.get_month_dates(
+        dt.date(2023, 5, 1), dt.date(2023, 5, 20)
+    )
+    start_dates = {
+        'kras': dt.date(2023, 5, 21),
+        'sayano': dt.date(2023, 5, 10),
+        'bratsk': dt.date(2023, 4, 1),
+    }
+    wanted = EbvuScraper.get_wanted(dates, start_dates)
+    assert wanted == 'bratsk:20230501,sayano:20230510'
+
+    start_dates['kras'] = dt.date(2023, 5, 15)
+    assert EbvuScraper.get_wanted(dates, start_dates) != wanted
+
+
+@pytest.mark.django_db
+def test_ebvu_scrape_fetches_each_month_once(monkeypatch):
+    Reservoir.objects.create(name='Красноярское', slug='kras')
+    start = dt.date.today().replace(day=1) - dt.timedelta(days=40)
+    pages = []
+
+    def get_page(date, cache, wanted):
+        pages.append(date)
+        return None
+
+    monkeypatch.setattr(EbvuScraper, 'get_dates', lambda r: {'kras': start})
+    monkeypatch.setattr(EbvuScraper, 'get_page', get_page)
+    monkeypatch.setattr(EbvuScraper, 'save_all', lambda s: WeatherWriter())
+    EbvuScraper.scrape()
+
+    assert pages[0] == start
+    assert [date.day for date in pages[1:]] == [1] * (len(pages) - 1)
+    assert len({(date.year, date.month) for date in pages}) == len(pages)
+    assert len(pages) in (2, 3)
+
+
+class RecordingSituationWriter(SituationWriter):
+    def write(self, rows):
+        self.written = [(row['reservoir_id'], row['date']) for row in rows]
+        return [(True, row['reservoir_id']) for row in rows]
+
+
+@pytest.mark.django_db
+def test_ebvu_backfill_writes_only_missing_dates(monkeypatch):
+    kras = Reservoir.objects.create(name='Красноярское', slug='kras')
+    sayano = Reservoir.objects.create(name='Саяно', slug='sayano')
+    month = dt.date(2023, 5, 1)
+    parsed = {
+        slug: [
+            Situation(date=month + dt.timedelta(days=i), level=100)
+            for i in range(3)
+        ]
+        for slug in ('kras', 'sayano')
+    }
+    writers = []
+
+    def get_writer():
+        writers.append(RecordingSituationWriter())
+        return writers[-1]
+
+    monkeypatch.setattr(EbvuScraper, 'get_page', lambda date: '<html>')
+    monkeypatch.setattr(EbvuScraper, 'get_archive', PageArchiveStub)
+    monkeypatch.setattr(EbvuScraper, 'parse_content', lambda *a: parsed)
+    monkeypatch.setattr(EbvuScraper, 'get_writer', get_writer)
+
+    EbvuScraper.backfill(month, {
+        kras.id: [dt.date(2023, 5, 2)],
+        sayano.id: [dt.date(2023, 5, 1), dt.date(2023, 5, 3)],
+    })
+
+    assert sorted(writers[0].written) == [
+        (kras.id, dt.date(2023, 5, 2)),
+        (sayano.id, dt.date(2023, 5, 1)),
+        (sayano.id, dt.date(2023, 5, 3)),
+    ]
+
+
+class PageArchiveStub:
+    def __init__(self):
+        self.urls = []
+
+    def put(self, url, *args, **kwargs):
+        self.urls.append(url)
+
+
+class CheckpointWriter(WeatherWriter):
+    def add_checkpoint(self, target, start, end):
+        self.checkpoints.append((target, start, end, 0))
+
+    def flush(self):
+        self.rows.clear()
+        return 0, 0
+
+
+def observations(start: dt.date, end: dt.date) -> list[WeatherBase]:
+    return [
+        WeatherBase(
+            date=dt.datetime.combine(start + dt.timedelta(days=i), dt.time()),
+            temp=0, pressure=750, humidity=80, cloudiness=0,
+            wind_speed=0, precipitation=0,
+        )
+        for i in range((end - start).days + 1)
+    ]
+
+
+@pytest.fixture
+def rp5_pages(monkeypatch):
+    pages = []
+
+    def get_page(driver, date, waiter):
+        pages.append(date)
+        return date.isoformat()
+
+    monkeypatch.setattr(RP5Scraper, 'range_days', 7)
+    monkeypatch.setattr(RP5Scraper, 'load_geo_object_page', lambda *a: None)
+    monkeypatch.setattr(RP5Scraper, 'select_period', lambda d, days: days)
+    monkeypatch.setattr(RP5Scraper, 'get_page', get_page)
+    monkeypatch.setattr(RP5Scraper, 'get_archive', lambda: PageArchiveStub())
+    monkeypatch.setattr(
+        RP5Scraper, 'parse_content', lambda content, date: []
+    )
+    return pages
+
+
+def scrape(writer: WeatherWriter, resume: bool = False) -> int:
+    return RP5Scraper.scrape_object(
+        None, None, writer, GeoObject(pk=1, name='test'),
+        dt.date(2023, 1, 1), dt.date(2023, 1, 21), resume,
+    )
+
+
+@pytest.mark.django_db
+def test_rp5_timeout_skips_only_its_window(rp5_pages, monkeypatch):
+    get_page = RP5Scraper.get_page
+
+    def get_page_or_timeout(driver, date, waiter):
+        if date == dt.date(2023, 1, 7):
+            raise TimeoutException('no archiveTable')
+        return get_page(driver, date, waiter)
+
+    monkeypatch.setattr(RP5Scraper, 'get_page', get_page_or_timeout)
+
+    assert scrape(WeatherWriter()) == 3
+    assert rp5_pages == [dt.date(2023, 1, 14), dt.date(2023, 1, 21)]
+
+
+@pytest.mark.django_db
+def test_rp5_checkpoints_only_complete_windows(rp5_pages, monkeypatch):
+    def parse_content(content, date):
+        end = dt.date.fromisoformat(content)
+        if end == dt.date(2023, 1, 14):
+            return observations(date, end)[1:]
+        return observations(date, end)
+
+    monkeypatch.setattr(RP5Scraper, 'parse_content', parse_content)
+    writer = CheckpointWriter(source='test')
+    scrape(writer)
+
+    assert [(start, end) for _, start, end, _ in writer.checkpoints] == [
+        (dt.date(2023, 1, 1), dt.date(2023, 1, 7)),
+        (dt.date(2023, 1, 15), dt.date(2023, 1, 21)),
+    ]
+
+
+@pytest.mark.django_db
+def test_rp5_explicit_range_ignores_checkpoints(rp5_pages):
+    Checkpoint.objects.create(
+        source=RP5Scraper.__name__, target=1,
+        start=dt.date(2023, 1, 1), end=dt.date(2023, 1, 7),
+    )
+
+    scrape(WeatherWriter())
+    assert len(rp5_pages) == 3
+
+    rp5_pages.clear()
+    scrape(WeatherWriter(), resume=True)
+    assert rp5_pages == [dt.date(2023, 1, 14), dt.date(2023, 1, 21)]
+
+
+@pytest.mark.django_db
+def test_rp5_scrape_returns_work_units():
+    geo_object = GeoObject.objects.create(
+        name='test', slug='test', station_id=29563
+    )
+    GeoObject.objects.create(name='other', slug='other')
+
+    assert RP5Scraper.scrape(0) == [(geo_object.id, None, None)]
+
+    units = RP5Scraper.scrape(7)
+    assert units[0] == (
+        geo_object.id, RP5Scraper.first_date,
+        RP5Scraper.first_date + dt.timedelta(days=6),
+    )
+    assert units[-1][2] == dt.date.today()
+
+
+@pytest.mark.django_db
+def test_rp5_archives_pages_under_station_url(rp5_pages, monkeypatch):
+    archive = PageArchiveStub()
+    monkeypatch.setattr(RP5Scraper, 'get_archive', lambda: archive)
+    RP5Scraper.scrape_object(
+        None, None, WeatherWriter(), GeoObject(pk=1, station_id=29563),
+        dt.date(2023, 1, 1), dt.date(2023, 1, 7),
+    )
+    assert archive.urls == [
+        f'{RP5Scraper.archive_url}?wmo_id=29563&lang=ru'
+    ]
+
+
+def test_gismeteo_bad_json_skips_only_its_geo_object(monkeypatch):
+    geo_objects = [GeoObject(pk=1), GeoObject(pk=2)]
+
+    async def get_data(client, geo_object, cache):
+        return '[]' if geo_object.pk == 1 else '<html>'
+
+    monkeypatch.setattr(GismeteoScraper, 'get_data', get_data)
+    monkeypatch.setattr(GismeteoScraper.parser, 'parse', lambda data: [])
+
+    results = asyncio.run(GismeteoScraper.fetch_all(geo_objects, None))
+    assert [geo_object.pk for geo_object, *_ in results] == [1]
@@ -0,0 +1,302 @@
+import datetime as dt
+from importlib import import_module
+from unittest import mock
+
+import numpy as np
+import pytest
+from django.apps import apps
+from django.db import connection
+
+from reservoirs.models import Reservoir, WaterSituation
+from services.scrapers import RP5Scraper
+from services.writers import (SituationWriter, WeatherWriter, get_checkpoints,
+                              get_contiguous_date, get_watermarks,
+                              is_checkpointed, seed_watermark)
+from weather.models import GeoObject, Weather
+from tasks.models import IngestionState
+
+
+class CursorStub:
+    def __init__(self, results):
+        self.results = results
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def copy_expert(self, sql, buffer):
+        self.executed.append((sql, buffer.read()))
+
+    def fetchall(self):
+        return self.results
+
+
+@pytest.mark.parametrize('writer_class, table, constraint, target', [
+    (
+        SituationWriter,
+        'water_situation',
+        'water_situation_date_reservoir_id_key',
+        'reservoir_id',
+    ),
+    (
+        WeatherWriter,
+        'weather_weather',
+        'date_geo_object_is_observable_unique',
+        'geo_object_id',
+    ),
+])
+def test_upsert_sql(writer_class, table, constraint, target):
+    writer = writer_class()
+    columns = (*writer.key_fields, *writer.value_fields)
+    sql = writer.get_sql(2)
+    names = ', '.join(f'"{column}"' for column in columns)
+    row = '({})'.format(', '.join(['%s'] * len(columns)))
+
+    assert sql.startswith(
+        f'INSERT INTO "{table}" ({names}) '
+        f'VALUES {row}, {row} '
+        f'ON CONFLICT ON CONSTRAINT {constraint} DO UPDATE SET '
+    )
+    for field in writer.value_fields:
+        assert (
+            f'"{field}" = COALESCE(EXCLUDED."{field}", "{table}"."{field}")'
+        ) in sql
+
+    current = ', '.join(f'"{table}"."{f}"' for f in writer.value_fields)
+    assert f'WHERE ({current}) IS DISTINCT FROM (COALESCE(' in sql
+    assert sql.endswith(f'RETURNING (xmax = 0), "{table}"."{target}"')
+
+
+def test_upsert_writer_counts_returned_rows():
+    writer = SituationWriter()
+    rows = [
+        {'date': dt.date(2023, 1, 1), 'reservoir_id': 1, 'level': 100.5},
+        {'date': dt.date(2023, 1, 1), 'reservoir_id': 2, 'inflow': 20},
+        {'date': dt.date(2023, 1, 2), 'reservoir_id': 1, 'level': 100.4},
+    ]
+    cursor = CursorStub([(True, 1), (False, 2), (False, 1)])
+
+    with mock.patch.object(connection, 'cursor', return_value=cursor):
+        results = writer.write(rows)
+
+    (sql, params), = cursor.executed
+    assert sql == writer.get_sql(3)
+    assert len(params) == 3 * 7
+    assert params[1:4] == [1, 100.5, None]
+    assert params[7 + 1] == 2
+
+    assert writer.count(results) == (1, 2)
+    assert (writer.inserted, writer.updated) == (1, 2)
+    assert dict(writer.counts) == {1: [1, 1], 2: [0, 1]}
+
+
+@pytest.mark.django_db
+def test_series_are_written_column_wise():
+    writer = SituationWriter(chunk_size=2)
+    columns = {
+        'date': np.array(
+            ['2023-01-01', '2023-01-02', '2023-01-03'], dtype='datetime64[D]'
+        ),
+        'level': np.array([100.5, 100.4, 100.3]),
+        'inflow': np.array([20.0, np.nan, 22.0]),
+    }
+    cursor = CursorStub([(True, 1), (False, 1)])
+
+    with mock.patch.object(connection, 'cursor', return_value=cursor):
+        writer.add_series(columns, Reservoir(pk=1))
+        writer.flush()
+
+    statements = [
+        (sql, params) for sql, params in cursor.executed
+        if 'SAVEPOINT' not in sql
+    ]
+    (sql, first), (_, second) = statements
+
+    assert sql == writer.get_columns_sql()
+    assert 'FROM unnest(%s::date[], ' in sql
+    assert 'WITH ORDINALITY AS batch ("date", "reservoir_id", ' in sql
+    assert 'ORDER BY "date", "reservoir_id", row_number DESC' in sql
+    assert first == [
+        [dt.date(2023, 1, 1), dt.date(2023, 1, 2)],
+        [1, 1],
+        [100.5, 100.4],
+        [None, None],
+        [20.0, None],
+        [None, None],
+        [None, None],
+    ]
+    assert second[0] == [dt.date(2023, 1, 3)]
+    assert (writer.inserted, writer.updated) == (2, 2)
+
+
+def test_merge_sql_keeps_last_duplicate():
+    sql = WeatherWriter().get_merge_sql('"staging"')
+    keys = '"date", "geo_object_id", "is_observable"'
+
+    assert f'SELECT DISTINCT ON ({keys}) {keys}, "temp"' in sql
+    assert f'FROM "staging" ORDER BY {keys}, ctid DESC ON CONFLICT' in sql
+
+
+@pytest.mark.django_db
+def test_copy_merges_staging_table():
+    writer = WeatherWriter()
+    columns = {
+        'date': np.array(
+            ['2023-01-15T14:00:00', '2023-01-15T14:00:00'],
+            dtype='datetime64[s]',
+        ),
+        'temp': np.array([-7.1, -7.0]),
+        'pressure': np.array([752, 752]),
+        'humidity': np.array([75, 75]),
+        'cloudiness': np.array([20, 20]),
+        'wind_speed': np.array([3.0, 3.0]),
+        'precipitation': np.array([1.5, np.nan]),
+    }
+    cursor = CursorStub([(True, 1)])
+
+    with mock.patch.object(connection, 'cursor', return_value=cursor):
+        assert writer.copy(
+            columns, geo_object_id=1, is_observable=True
+        ) == (1, 0)
+
+    statements = [
+        (sql, params) for sql, params in cursor.executed
+        if 'SAVEPOINT' not in sql
+    ]
+    (create, _), (copy, data), (merge, _) = statements
+    staging = '"weather_weather_staging"'
+
+    assert create.startswith(f'CREATE TEMP TABLE {staging} ON COMMIT DROP')
+    assert copy.startswith(f'COPY {staging} ')
+    assert data.splitlines() == [
+        '2023-01-15T14:00:00Z,1,True,-7.1,752,75,20,3.0,1.5',
+        '2023-01-15T14:00:00Z,1,True,-7.0,752,75,20,3.0,',
+    ]
+    assert merge == writer.get_merge_sql(staging)
+
+
+def test_writer_last_dates():
+    writer = WeatherWriter()
+    last_dates = writer.get_last_dates(
+        [1, 2, 1],
+        [
+            dt.datetime(2023, 1, 2, 3),
+            np.datetime64('2023-01-05T00:00:00'),
+            dt.datetime(2023, 1, 1),
+        ],
+    )
+    assert last_dates == {1: dt.date(2023, 1, 2), 2: dt.date(2023, 1, 5)}
+
+
+@pytest.mark.django_db
+def test_writer_saves_ingestion_state():
+    writer = WeatherWriter(source='test')
+    writer.save_states({1: dt.date(2023, 1, 2)}, [(True, 1), (False, 1)])
+    writer.count([(True, 1), (False, 1)])
+    writer.save_states({1: dt.date(2023, 1, 1)}, [(True, 1)])
+
+    state = IngestionState.objects.get(source='test', target=1)
+    assert state.last_date == dt.date(2023, 1, 2)
+    assert state.inserted_count == 2
+    assert state.updated_count == 1
+    assert get_watermarks('test', [1, 2]) == {1: dt.date(2023, 1, 2)}
+
+
+@pytest.mark.django_db
+def test_writer_commits_checkpoints():
+    writer = WeatherWriter(source='test')
+    writer.add_checkpoint(1, dt.date(2023, 1, 1), dt.date(2023, 1, 7))
+    writer.add_checkpoint(1, dt.date(2023, 1, 8), dt.date(2023, 1, 14))
+
+    checkpoints = get_checkpoints('test', 1)
+    assert len(checkpoints) == 2
+    assert is_checkpointed(
+        checkpoints, dt.date(2023, 1, 2), dt.date(2023, 1, 5)
+    )
+    assert not is_checkpointed(
+        checkpoints, dt.date(2023, 1, 6), dt.date(2023, 1, 9)
+    )
+    assert not writer.checkpoints
+
+
+def test_contiguous_date_stops_at_missing_chunk():
+    checkpoints = [
+        (dt.date(2023, 1, 15), dt.date(2023, 1, 21)),
+        (dt.date(2023, 1, 1), dt.date(2023, 1, 7)),
+    ]
+    assert get_contiguous_date(dt.date(2022, 12, 31), checkpoints) == (
+        dt.date(2023, 1, 7)
+    )
+
+    checkpoints.append((dt.date(2023, 1, 8), dt.date(2023, 1, 14)))
+    assert get_contiguous_date(dt.date(2022, 12, 31), checkpoints) == (
+        dt.date(2023, 1, 21)
+    )
+    assert get_contiguous_date(dt.date(2023, 2, 1), checkpoints) == (
+        dt.date(2023, 2, 1)
+    )
+
+
+@pytest.mark.django_db
+def test_contiguous_writer_advances_only_over_checkpoints():
+    seed_watermark('test', 1, dt.date(2022, 12, 31))
+    writer = WeatherWriter(source='test', contiguous=True)
+    writer.save_states({1: dt.date(2023, 1, 14)}, [(True, 1)])
+    writer.save_checkpoints(
+        [(1, dt.date(2023, 1, 8), dt.date(2023, 1, 14), 1)]
+    )
+    assert get_watermarks('test', [1]) == {1: dt.date(2022, 12, 31)}
+
+    writer.save_checkpoints(
+        [(1, dt.date(2023, 1, 1), dt.date(2023, 1, 7), 1)]
+    )
+    assert get_watermarks('test', [1]) == {1: dt.date(2023, 1, 14)}
+
+
+@pytest.mark.django_db
+def test_rp5_last_date_reads_only_the_watermark():
+    geo_object = GeoObject.objects.create(name='test', slug='test')
+    assert RP5Scraper.get_last_date(geo_object) == RP5Scraper.first_date
+
+    seed_watermark(RP5Scraper.__name__, geo_object.id, dt.date(2023, 1, 1))
+    Weather.objects.create(
+        geo_object=geo_object,
+        date=dt.datetime(2023, 2, 1, 12, tzinfo=dt.timezone.utc),
+        temp=0, pressure=750, humidity=80, cloudiness=0,
+        wind_speed=0, precipitation=0, is_observable=True,
+    )
+    assert RP5Scraper.get_last_date(geo_object) == dt.date(2023, 1, 1)
+
+
+@pytest.mark.django_db
+def test_migration_seeds_watermarks_from_facts():
+    migration = import_module('tasks.migrations.0007_seed_ingestion_states')
+    geo_object = GeoObject.objects.create(
+        name='test', slug='test', station_id=29563
+    )
+    reservoir = Reservoir.objects.create(name='Братское', slug='bratsk')
+    seed_watermark(RP5Scraper.__name__, geo_object.id, dt.date(2023, 1, 1))
+    Weather.objects.create(
+        geo_object=geo_object,
+        date=dt.datetime(2023, 2, 1, 12, tzinfo=dt.timezone.utc),
+        temp=0, pressure=750, humidity=80, cloudiness=0,
+        wind_speed=0, precipitation=0, is_observable=True,
+    )
+    WaterSituation.objects.create(
+        reservoir=reservoir, date=dt.date(2023, 3, 1), level=400
+    )
+
+    migration.seed_ingestion_states(apps, None)
+
+    assert get_watermarks(RP5Scraper.__name__, [geo_object.id]) == {
+        geo_object.id: dt.date(2023, 2, 1)
+    }
+    assert get_watermarks('EbvuScraper', [reservoir.id]) == {
+        reservoir.id: dt.date(2023, 3, 1)
+    }
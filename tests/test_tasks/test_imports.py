@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+WEB_DIR = Path(__file__).resolve().parents[2] / 'web'
+HEAVY_MODULES = ('torch', 'pytorch_forecasting', 'lightning', 'pandas')
+IMPORT_BUDGET = float(os.environ.get('IMPORT_BUDGET', 10))
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'modules': list(sys.modules)}}))
+"""
+
+
+@pytest.mark.parametrize('module', [
+    'services.scrapers', 'tasks.tasks', 'web.urls', 'web.celery'
+])
+def test_import_graph_stays_light(module):
+    result = subprocess.run(
+        [sys.executable, '-c', SCRIPT.format(module=module)],
+        cwd=WEB_DIR,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'web.settings.test'},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = json.loads(result.stdout.splitlines()[-1])
+    leaked = {
+        name.split('.')[0] for name in report['modules']
+        if name.split('.')[0] in HEAVY_MODULES
+    }
+
+    assert not leaked, f'{module} imports {", ".join(sorted(leaked))}'
+    assert report['elapsed'] < IMPORT_BUDGET
@@ -0,0 +1,25 @@
+import pytest
+from django.conf import settings
+
+from web.celery import app
+
+
+def get_queue(name: str) -> str:
+    options = app.amqp.router.route({}, f'tasks.tasks.{name}')
+    return options['queue'].name
+
+
+@pytest.mark.parametrize('name, queue', [
+    ('run_rushydro_parsing', settings.BROWSER_QUEUE),
+    ('run_rp5_geo_object_parsing', settings.BROWSER_QUEUE),
+    ('run_ebvu_parsing', settings.HTTP_QUEUE),
+    ('run_ebvu_backfill', settings.HTTP_QUEUE),
+    ('run_gismeteo_parsing', settings.HTTP_QUEUE),
+    ('run_roshydromet_parsing', settings.HTTP_QUEUE),
+    ('run_water_situation_forecasting', settings.ML_QUEUE),
+    ('run_rp5_parsing', 'celery'),
+    ('run_gap_backfill', 'celery'),
+    ('log_rp5_throughput', 'celery'),
+])
+def test_task_queue(name, queue):
+    assert get_queue(name) == queue
@@ -0,0 +1,82 @@
+import datetime as dt
+
+import fakeredis
+import pytest
+
+from services import leases
+from services.leases import Lease
+from services.scrapers import EbvuScraper, RP5Scraper
+from tasks import tasks
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(leases, '_client', client)
+    return client
+
+
+@pytest.fixture
+def scrapes(client, monkeypatch):
+    scrapes = []
+
+    def scrape_geo_object(geo_object_id, start, end, resume, interrupts):
+        scrapes.append({
+            'resume': resume,
+            'leased': len(client.keys(f'lease:RP5Scraper:{geo_object_id}:*')),
+        })
+        return {'interrupted': len(scrapes) < 3}
+
+    monkeypatch.setattr(RP5Scraper, 'scrape_geo_object', scrape_geo_object)
+    return scrapes
+
+
+def test_rp5_resume_keeps_retry_count_and_releases_lease(scrapes, client):
+    result = tasks.run_rp5_geo_object_parsing.apply(args=(1, None, None))
+
+    assert result.get() == {'interrupted': False}
+    assert scrapes == [
+        {'resume': False, 'leased': 1},
+        {'resume': True, 'leased': 1},
+        {'resume': True, 'leased': 1},
+    ]
+    assert not client.keys('lease:*')
+
+
+def test_rp5_resume_stops_when_run_budget_is_spent(scrapes, monkeypatch):
+    monkeypatch.setattr(tasks, 'RP5_RUN_BUDGET', 0)
+
+    result = tasks.run_rp5_geo_object_parsing.apply(args=(1, None, None))
+
+    assert result.get() == {'interrupted': True}
+    assert len(scrapes) == 1
+
+
+def test_rp5_lease_is_kept_per_window(scrapes):
+    assert Lease('RP5Scraper:1:2023-01-01:2023-01-07').acquire()
+
+    assert tasks.run_rp5_geo_object_parsing.apply(
+        args=(1, '2023-01-01', '2023-01-07')
+    ).get() is None
+    assert not scrapes
+
+    tasks.run_rp5_geo_object_parsing.apply(
+        args=(1, '2023-01-08', '2023-01-14')
+    ).get()
+    assert scrapes
+
+
+def test_ebvu_parsing_runs_while_a_month_is_backfilled(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(EbvuScraper, 'scrape', lambda: calls.append(1))
+    monkeypatch.setattr(
+        EbvuScraper, 'backfill', lambda month, gaps: calls.append(month)
+    )
+    assert Lease('EbvuScraper:2023-05-01').acquire()
+
+    assert tasks.run_ebvu_parsing.apply().get()
+    assert tasks.run_ebvu_backfill.apply(
+        args=('2023-05-01', {'1': ['2023-05-02']})
+    ).get() is None
+    tasks.run_ebvu_backfill.apply(args=('2023-06-01', {'1': ['2023-06-02']}))
+    assert calls == [1, dt.date(2023, 6, 1)]
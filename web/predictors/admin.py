@@ -13,6 +13,7 @@ class MixinAdmin(admin.ModelAdmin):
 class WaterSituationPredictorAdmin(MixinAdmin):
     list_display = ('id', 'name', 'reservoir', 'geo_objects_count')
     list_filter = ('reservoir', )
+    readonly_fields = ('checkpoint_hash', )
 
     @admin.display(description='Кол-во объектов')
     def geo_objects_count(self, obj):
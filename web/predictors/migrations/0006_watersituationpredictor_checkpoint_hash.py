@@ -0,0 +1,18 @@
+# Generated by Django 4.0.6 on 2026-10-18 11:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictors', '0005_alter_watersituationpredictor_reservoir'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='watersituationpredictor',
+            name='checkpoint_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 файла состояния модели', max_length=64, verbose_name='Хеш модели'),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import hashlib
+
 from django.db import models
 
 
@@ -19,6 +21,13 @@ class WaterSituationPredictor(models.Model):
         help_text='Файл состояния модели в формате ckpt',
         upload_to='predictors/checkpoints/',
     )
+    checkpoint_hash = models.CharField(
+        verbose_name='Хеш модели',
+        help_text='SHA-256 файла состояния модели',
+        max_length=64,
+        blank=True,
+        editable=False,
+    )
     geo_objects = models.ManyToManyField(
         to='weather.GeoObject',
         verbose_name='Географические объекты',
@@ -32,6 +41,34 @@ class WaterSituationPredictor(models.Model):
     def __str__(self):
         return self.name
 
+    def get_checkpoint_hash(self) -> str:
+        checksum = hashlib.sha256()
+
+        with self.checkpoint.open('rb') as checkpoint:
+            for chunk in checkpoint.chunks():
+                checksum.update(chunk)
+
+        return checksum.hexdigest()
+
+    def save(self, *args, **kwargs):
+        stored = WaterSituationPredictor.objects.filter(
+            pk=self.pk
+        ).values_list(
+            'checkpoint', flat=True
+        ).first() if self.pk else None
+
+        super().save(*args, **kwargs)
+
+        if self.checkpoint and (
+            self.checkpoint.name != stored or not self.checkpoint_hash
+        ):
+            self.checkpoint_hash = self.get_checkpoint_hash()
+            WaterSituationPredictor.objects.filter(
+                pk=self.pk
+            ).update(
+                checkpoint_hash=self.checkpoint_hash
+            )
+
 
 class WaterSituationForecast(models.Model):
     date = models.DateField(
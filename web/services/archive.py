@@ -0,0 +1,63 @@
+import datetime as dt
+import hashlib
+from os import environ as env
+from typing import Optional
+
+import zstandard
+from celery.utils.log import get_task_logger
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import DatabaseError
+
+from tasks.models import ArchivedPage
+
+logger = get_task_logger(__name__)
+
+
+class PageArchive:
+    enabled: bool = env.get('PAGE_ARCHIVE', 'on') == 'on'
+    level: int = int(env.get('PAGE_ARCHIVE_LEVEL', 10))
+
+    def __init__(self, source: str):
+        self.source = source
+
+    def put(
+        self,
+        url: str,
+        content: str,
+        date: Optional[dt.date] = None,
+        target: Optional[int] = None,
+    ) -> Optional[ArchivedPage]:
+        if not self.enabled:
+            return None
+
+        data = content.encode()
+        page = ArchivedPage(
+            source=self.source,
+            url=url,
+            date=date or dt.date.today(),
+            target=target,
+            content_hash=hashlib.sha256(data).hexdigest(),
+            size=len(data),
+        )
+
+        try:
+            if not default_storage.exists(page.path):
+                compressor = zstandard.ZstdCompressor(level=self.level)
+                default_storage.save(
+                    page.path, ContentFile(compressor.compress(data))
+                )
+
+            page.save()
+            return page
+
+        except (OSError, DatabaseError) as error:
+            logger.error(f'{self.__class__.__name__} {repr(error)}')
+            return None
+
+    @staticmethod
+    def read(path: str) -> str:
+        with default_storage.open(path) as file:
+            data = zstandard.ZstdDecompressor().decompress(file.read())
+
+        return data.decode()
@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from os import environ as env
+from typing import Any, Callable, Iterator, Optional
+
+from celery.utils.log import get_task_logger
+from selenium import webdriver
+from selenium.common.exceptions import (TimeoutException,
+                                        WebDriverException)
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = get_task_logger(__name__)
+
+SELENIUM_URL = env.get('SELENIUM_URL', 'http://selenium:4444/wd/hub')
+POOL_SIZE = int(env.get('SELENIUM_POOL_SIZE', 1))
+MAX_AGE = float(env.get('SELENIUM_MAX_AGE', 30 * 60))
+MAX_USES = int(env.get('SELENIUM_MAX_USES', 50))
+LEASE_TIMEOUT = float(env.get('SELENIUM_LEASE_TIMEOUT', 5 * 60))
+PAGE_LOAD_STRATEGY = env.get('SELENIUM_PAGE_LOAD_STRATEGY', 'eager')
+BLOCK_IMAGES = env.get('SELENIUM_BLOCK_IMAGES', 'on') == 'on'
+BLOCK_STYLES = env.get('SELENIUM_BLOCK_STYLES', 'on') == 'on'
+WAIT_TIMEOUT = float(env.get('SELENIUM_WAIT_TIMEOUT', 30))
+WAIT_POLL = float(env.get('SELENIUM_WAIT_POLL', 0.2))
+
+_pool: Optional['DriverPool'] = None
+_pid = os.getpid()
+
+
+def get_options(
+    page_load_strategy: str = PAGE_LOAD_STRATEGY,
+    block_images: bool = BLOCK_IMAGES,
+    block_styles: bool = BLOCK_STYLES,
+) -> webdriver.FirefoxOptions:
+    options = webdriver.FirefoxOptions()
+    options.add_argument('--headless')
+    options.page_load_strategy = page_load_strategy
+
+    if block_images:
+        options.set_preference('permissions.default.image', 2)
+
+    if block_styles:
+        options.set_preference('permissions.default.stylesheet', 2)
+
+    return options
+
+
+class DriverSession:
+    def __init__(self, driver: WebDriver):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+    def is_alive(self) -> bool:
+        try:
+            self.driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def reset(self) -> bool:
+        try:
+            self.driver.delete_all_cookies()
+            self.driver.get('about:blank')
+            return True
+        except WebDriverException:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except WebDriverException as error:
+            logger.warning(f'{self.__class__.__name__} {repr(error)}')
+
+
+class DriverPool:
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        max_age: float = MAX_AGE,
+        max_uses: int = MAX_USES,
+        lease_timeout: float = LEASE_TIMEOUT,
+        url: str = SELENIUM_URL,
+    ):
+        self.size = size
+        self.max_age = max_age
+        self.max_uses = max_uses
+        self.lease_timeout = lease_timeout
+        self.url = url
+        self.idle: deque[DriverSession] = deque()
+        self.leased = 0
+        self.created = 0
+        self.recycled = 0
+        self.condition = threading.Condition()
+
+    def create(self) -> DriverSession:
+        driver = webdriver.Remote(self.url, options=get_options())
+        self.created += 1
+        return DriverSession(driver)
+
+    def is_expired(self, session: DriverSession) -> bool:
+        return session.age > self.max_age or session.uses >= self.max_uses
+
+    def discard(self, session: DriverSession):
+        self.recycled += 1
+        session.quit()
+
+    def acquire(self) -> DriverSession:
+        with self.condition:
+            ready = self.condition.wait_for(
+                lambda: self.idle or self.leased < self.size,
+                timeout=self.lease_timeout,
+            )
+
+            if not ready:
+                raise TimeoutError(
+                    f'No free browser session in {self.lease_timeout}s'
+                )
+
+            session = self.idle.pop() if self.idle else None
+            self.leased += 1
+
+        try:
+            if session is not None:
+                if not self.is_expired(session) and session.is_alive():
+                    session.uses += 1
+                    return session
+
+                self.discard(session)
+
+            session = self.create()
+            session.uses += 1
+            return session
+
+        except BaseException:
+            with self.condition:
+                self.leased -= 1
+                self.condition.notify()
+            raise
+
+    def release(self, session: DriverSession, broken: bool = False):
+        keep = (
+            not broken
+            and not self.is_expired(session)
+            and session.reset()
+        )
+
+        if not keep:
+            self.discard(session)
+
+        with self.condition:
+            self.leased -= 1
+
+            if keep:
+                self.idle.append(session)
+
+            self.condition.notify()
+
+    @contextmanager
+    def lease(self) -> Iterator[WebDriver]:
+        session = self.acquire()
+        broken = False
+
+        try:
+            yield session.driver
+
+        except WebDriverException as error:
+            broken = not isinstance(error, TimeoutException)
+            raise
+
+        finally:
+            self.release(session, broken=broken)
+
+    def close(self):
+        with self.condition:
+            sessions = list(self.idle)
+            self.idle.clear()
+
+        for session in sessions:
+            session.quit()
+
+    def stats(self) -> dict:
+        with self.condition:
+            return {
+                'size': self.size,
+                'idle': len(self.idle),
+                'leased': self.leased,
+                'created': self.created,
+                'recycled': self.recycled,
+            }
+
+
+class Waiter:
+    def __init__(
+        self,
+        driver: WebDriver,
+        timeout: float = WAIT_TIMEOUT,
+        poll: float = WAIT_POLL,
+    ):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll = poll
+        self.times: dict[str, list[float]] = defaultdict(list)
+
+    def until(
+        self,
+        step: str,
+        condition: Callable[[WebDriver], Any],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        wait = WebDriverWait(
+            self.driver, timeout or self.timeout, poll_frequency=self.poll
+        )
+        start = time.monotonic()
+
+        try:
+            return wait.until(condition)
+
+        finally:
+            self.times[step].append(time.monotonic() - start)
+
+    def summary(self) -> str:
+        return ', '.join(
+            f'{step}: {len(times)} waits, {sum(times):.1f}s total, '
+            f'{max(times):.1f}s max'
+            for step, times in self.times.items()
+        )
+
+
+def get_pool() -> DriverPool:
+    global _pool, _pid
+
+    if _pid != os.getpid():
+        _pool = None
+        _pid = os.getpid()
+
+    if _pool is None:
+        _pool = DriverPool()
+
+    return _pool
+
+
+def close_pool():
+    if _pool is not None and _pid == os.getpid():
+        _pool.close()
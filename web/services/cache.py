@@ -0,0 +1,124 @@
+import hashlib
+from typing import Iterable, Optional, Union
+
+import httpx
+from celery.utils.log import get_task_logger
+from django.db import DatabaseError
+from django.utils import timezone
+
+from tasks.models import FetchState
+
+logger = get_task_logger(__name__)
+
+
+class PageCache:
+    def __init__(self, source: str, urls: Iterable[str] = ()):
+        self.source = source
+        self.states: dict[str, FetchState] = {}
+        self.pending: dict[str, FetchState] = {}
+        self.skipped = 0
+        self.loaded = set(urls)
+
+        if self.loaded:
+            self.states = {
+                state.url: state
+                for state in FetchState.objects.filter(url__in=self.loaded)
+            }
+
+    @staticmethod
+    def get_hash(content: Union[str, bytes]) -> str:
+        if isinstance(content, str):
+            content = content.encode()
+        return hashlib.sha256(content).hexdigest()
+
+    def get_state(self, url: str) -> FetchState:
+        if url not in self.states and url not in self.loaded:
+            self.states[url] = FetchState.objects.filter(url=url).first()
+            self.loaded.add(url)
+
+        if self.states.get(url) is None:
+            self.states[url] = FetchState(source=self.source, url=url)
+
+        return self.states[url]
+
+    def get_headers(self, url: str, wanted: Optional[str] = None) -> dict:
+        state = self.get_state(url)
+        headers = {}
+
+        if state.wanted != wanted:
+            return headers
+
+        if state.etag:
+            headers['If-None-Match'] = state.etag
+
+        if state.last_modified:
+            headers['If-Modified-Since'] = state.last_modified
+
+        return headers
+
+    def skip(self, url: str):
+        state = self.get_state(url)
+        state.skip_count += 1
+        state.checked_at = timezone.now()
+
+        self.pending[url] = state
+        self.skipped += 1
+
+        logger.info(f'{self.source} skipped unchanged page {url}')
+
+    def is_changed(
+        self,
+        url: str,
+        content: Union[str, bytes],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        wanted: Optional[str] = None,
+    ) -> bool:
+        state = self.get_state(url)
+        content_hash = self.get_hash(content)
+
+        if state.content_hash == content_hash and state.wanted == wanted:
+            self.skip(url)
+            return False
+
+        now = timezone.now()
+
+        state.etag = etag
+        state.last_modified = last_modified
+        state.content_hash = content_hash
+        state.wanted = wanted
+        state.fetch_count += 1
+        state.fetched_at = now
+        state.checked_at = now
+
+        self.pending[url] = state
+
+        return True
+
+    def is_modified(
+        self,
+        url: str,
+        response: httpx.Response,
+        wanted: Optional[str] = None,
+    ) -> bool:
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            self.skip(url)
+            return False
+
+        return self.is_changed(
+            url,
+            response.content,
+            response.headers.get('ETag'),
+            response.headers.get('Last-Modified'),
+            wanted,
+        )
+
+    def save(self):
+        try:
+            for state in self.pending.values():
+                state.save()
+
+        except DatabaseError as error:
+            logger.error(f'{self.__class__.__name__} {repr(error)}')
+
+        self.pending.clear()
@@ -0,0 +1,65 @@
+import os
+from importlib.util import find_spec
+from os import environ as env
+
+import httpx
+
+HTTP2 = find_spec('h2') is not None
+ENCODINGS = ', '.join(
+    ['gzip', 'deflate'] + (['br'] if find_spec('brotli') else [])
+)
+
+TIMEOUT = float(env.get('HTTP_TIMEOUT', 30))
+RETRIES = int(env.get('HTTP_RETRIES', 3))
+MAX_CONNECTIONS = int(env.get('HTTP_MAX_CONNECTIONS', 10))
+
+_clients: dict[bool, httpx.Client] = {}
+_pid = os.getpid()
+
+
+def get_limits(max_connections: int = MAX_CONNECTIONS) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+    )
+
+
+def get_client_options() -> dict:
+    return {
+        'headers': {'Accept-Encoding': ENCODINGS},
+        'timeout': httpx.Timeout(TIMEOUT),
+        'follow_redirects': True,
+    }
+
+
+def get_client(verify: bool = True) -> httpx.Client:
+    global _pid
+
+    if _pid != os.getpid():
+        _clients.clear()
+        _pid = os.getpid()
+
+    if verify not in _clients:
+        transport = httpx.HTTPTransport(
+            verify=verify,
+            http2=HTTP2,
+            limits=get_limits(),
+            retries=RETRIES,
+        )
+        _clients[verify] = httpx.Client(
+            transport=transport, **get_client_options()
+        )
+
+    return _clients[verify]
+
+
+def get_async_client(
+    verify: bool = True, max_connections: int = MAX_CONNECTIONS
+) -> httpx.AsyncClient:
+    transport = httpx.AsyncHTTPTransport(
+        verify=verify,
+        http2=HTTP2,
+        limits=get_limits(max_connections),
+        retries=RETRIES,
+    )
+    return httpx.AsyncClient(transport=transport, **get_client_options())
@@ -7,6 +7,7 @@ from django.db import DatabaseError
 from pytorch_forecasting import TemporalFusionTransformer as TFT
 
 from predictors.models import WaterSituationForecast, WaterSituationPredictor
+from services.model_cache import model_cache
 from weather.models import Weather
 
 logger = get_task_logger(__name__)
@@ -21,9 +22,25 @@ class InflowForecastWorker:
 
     def _get_model(self) -> TFT:
         if self._model is None:
-            self._model = TFT.load_from_checkpoint(self.predictor.checkpoint)
+            self._model = model_cache.get(
+                self.predictor.id,
+                self._get_checkpoint_hash(),
+                lambda: TFT.load_from_checkpoint(self.predictor.checkpoint),
+            )
         return self._model
 
+    def _get_checkpoint_hash(self) -> str:
+        if not self.predictor.checkpoint_hash:
+            self.predictor.checkpoint_hash = (
+                self.predictor.get_checkpoint_hash()
+            )
+            WaterSituationPredictor.objects.filter(
+                id=self.predictor.id
+            ).update(
+                checkpoint_hash=self.predictor.checkpoint_hash
+            )
+        return self.predictor.checkpoint_hash
+
     def get_situation_data(self) -> pd.DataFrame:
         max_encoder_length = self.model.hparams['max_encoder_length']
 
@@ -156,3 +173,5 @@ def water_situation_forecasting():
     for predictor in predictors:
         forecast_worker = InflowForecastWorker(predictor)
         forecast_worker.predict()
+
+    logger.info(model_cache.summary())
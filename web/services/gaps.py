@@ -0,0 +1,158 @@
+import datetime as dt
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import connection, models
+
+from reservoirs.models import WaterSituation
+from weather.models import Weather
+
+
+class GapFinder:
+    model: type[models.Model]
+    target_field: str
+    date_field: str = 'date'
+
+    @classmethod
+    def get_column(cls, field: str) -> str:
+        column = cls.model._meta.get_field(field).column
+        return connection.ops.quote_name(column)
+
+    @classmethod
+    def get_filter_sql(cls) -> str:
+        return 'TRUE'
+
+    @classmethod
+    def get_day_sql(cls) -> str:
+        return cls.get_column(cls.date_field)
+
+    @classmethod
+    def get_match_sql(cls) -> str:
+        return f'f.{cls.get_column(cls.date_field)} = d.day'
+
+    @classmethod
+    def get_sql(cls) -> str:
+        table = connection.ops.quote_name(cls.model._meta.db_table)
+        target = cls.get_column(cls.target_field)
+
+        return (
+            f'WITH bounds AS ('
+            f'SELECT {target} AS target, '
+            f'MIN({cls.get_day_sql()}) AS first_day, '
+            f'MAX({cls.get_day_sql()}) AS last_day '
+            f'FROM {table} '
+            f'WHERE {target} = ANY(%(targets)s::int[]) '
+            f'AND {cls.get_filter_sql()} '
+            f'GROUP BY {target}) '
+            f'SELECT b.target, d.day FROM bounds b '
+            f'CROSS JOIN LATERAL ('
+            f'SELECT generate_series('
+            f'GREATEST(b.first_day, %(start)s::date), '
+            f'LEAST(b.last_day, %(end)s::date), '
+            f"interval '1 day')::date AS day) d "
+            f'WHERE NOT EXISTS ('
+            f'SELECT 1 FROM {table} f '
+            f'WHERE f.{target} = b.target AND {cls.get_match_sql()} '
+            f'AND {cls.get_filter_sql()}) '
+            f'ORDER BY b.target, d.day'
+        )
+
+    @classmethod
+    def get_params(cls) -> dict:
+        return {}
+
+    @classmethod
+    def find(
+        cls,
+        targets: Iterable[int],
+        start: Optional[dt.date] = None,
+        end: Optional[dt.date] = None,
+    ) -> dict[int, list[dt.date]]:
+        targets = list(targets)
+
+        if not targets:
+            return {}
+
+        params = {
+            'targets': targets,
+            'start': start or dt.date.min,
+            'end': end or dt.date.today() - dt.timedelta(days=1),
+            **cls.get_params(),
+        }
+        gaps = defaultdict(list)
+
+        with connection.cursor() as cursor:
+            cursor.execute(cls.get_sql(), params)
+
+            for target, day in cursor.fetchall():
+                gaps[target].append(day)
+
+        return dict(gaps)
+
+
+class SituationGapFinder(GapFinder):
+    model = WaterSituation
+    target_field = 'reservoir_id'
+
+
+class WeatherGapFinder(GapFinder):
+    model = Weather
+    target_field = 'geo_object_id'
+
+    @classmethod
+    def get_filter_sql(cls) -> str:
+        return f'{cls.get_column("is_observable")}'
+
+    @classmethod
+    def get_day_sql(cls) -> str:
+        return (
+            f'({cls.get_column(cls.date_field)} '
+            f'AT TIME ZONE %(timezone)s)::date'
+        )
+
+    @classmethod
+    def get_match_sql(cls) -> str:
+        date = cls.get_column(cls.date_field)
+        return (
+            f'f.{date} >= (d.day::timestamp AT TIME ZONE %(timezone)s) '
+            f'AND f.{date} < '
+            f'((d.day + 1)::timestamp AT TIME ZONE %(timezone)s)'
+        )
+
+    @classmethod
+    def get_params(cls) -> dict:
+        return {'timezone': settings.TIME_ZONE}
+
+
+def group_by_month(
+    gaps: dict[int, list[dt.date]]
+) -> dict[dt.date, dict[int, list[dt.date]]]:
+    months = defaultdict(lambda: defaultdict(list))
+
+    for target, dates in gaps.items():
+        for date in sorted(dates):
+            months[date.replace(day=1)][target].append(date)
+
+    return {month: dict(gaps) for month, gaps in sorted(months.items())}
+
+
+def group_ranges(
+    dates: Iterable[dt.date], max_days: int
+) -> list[tuple[dt.date, dt.date]]:
+    ranges = []
+
+    for date in sorted(dates):
+        if ranges:
+            start, end = ranges[-1]
+
+            if (
+                date - end == dt.timedelta(days=1)
+                and (date - start).days < max_days
+            ):
+                ranges[-1] = (start, date)
+                continue
+
+        ranges.append((date, date))
+
+    return ranges
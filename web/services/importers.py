@@ -0,0 +1,122 @@
+import gzip
+import io
+from os import environ as env
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+
+class RP5ExportReader:
+    columns: dict[str, str] = {
+        'T': 'temp',
+        'Po': 'pressure',
+        'U': 'humidity',
+        'N': 'cloudiness',
+        'Ff': 'wind_speed',
+        'RRR': 'precipitation',
+    }
+    int_fields: tuple[str, ...] = ('pressure', 'humidity', 'cloudiness')
+    digit_fields: tuple[str, ...] = ('cloudiness', 'wind_speed')
+    required_fields: tuple[str, ...] = ('temp', 'humidity')
+    date_format: str = '%d.%m.%Y %H:%M'
+    chunk_size: int = int(env.get('RP5_IMPORT_CHUNK_SIZE', 100000))
+
+    def __init__(
+        self,
+        path: Path,
+        timezone: str,
+        encoding: str = 'utf-8',
+        chunk_size: Optional[int] = None,
+    ):
+        self.path = Path(path)
+        self.timezone = timezone
+        self.encoding = encoding
+
+        if chunk_size is not None:
+            self.chunk_size = chunk_size
+
+    @property
+    def suffixes(self) -> list[str]:
+        return [suffix.lower() for suffix in self.path.suffixes]
+
+    def read_frames(self):
+        import pandas as pd
+
+        if '.xls' in self.suffixes or '.xlsx' in self.suffixes:
+            if self.suffixes[-1] == '.gz':
+                with gzip.open(self.path) as file:
+                    content = io.BytesIO(file.read())
+            else:
+                content = self.path
+
+            frame = pd.read_excel(content, skiprows=6, dtype=str)
+            for start in range(0, len(frame), self.chunk_size):
+                yield frame.iloc[start:start + self.chunk_size]
+            return
+
+        yield from pd.read_csv(
+            self.path,
+            sep=';',
+            comment='#',
+            dtype=str,
+            encoding=self.encoding,
+            index_col=False,
+            chunksize=self.chunk_size,
+        )
+
+    def convert(self, frame) -> dict[str, np.ndarray]:
+        import pandas as pd
+
+        dates = pd.to_datetime(
+            frame.iloc[:, 0].str.strip(),
+            format=self.date_format,
+            errors='coerce',
+        )
+        data = {}
+
+        for column, field in self.columns.items():
+            values = frame[column].astype(str).str.strip()
+
+            if field in self.digit_fields:
+                values = values.str.extract(r'(\d+)', expand=False)
+
+            else:
+                values = values.str.replace(',', '.', regex=False)
+
+            data[field] = pd.to_numeric(values, errors='coerce')
+
+        result = pd.DataFrame(data)
+        result['date'] = dates.dt.tz_localize(
+            self.timezone, ambiguous='NaT', nonexistent='NaT'
+        ).dt.tz_convert('UTC').dt.tz_localize(None)
+
+        mask = result['date'].notna()
+        for field in self.required_fields:
+            mask &= result[field].notna()
+
+        result = result[mask].fillna(0)
+
+        columns = {'date': result['date'].to_numpy('datetime64[s]')}
+        for field in self.columns.values():
+            column = result[field].to_numpy(float)
+            columns[field] = (
+                column.astype(np.int64) if field in self.int_fields
+                else column
+            )
+
+        skipped = len(frame) - len(result)
+        if skipped:
+            logger.warning(f'{self.path.name}: skipped {skipped} rows')
+
+        return columns
+
+    def __iter__(self) -> Iterator[dict[str, np.ndarray]]:
+        for frame in self.read_frames():
+            columns = self.convert(frame)
+
+            if len(columns['date']):
+                yield columns
@@ -0,0 +1,242 @@
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+from os import environ as env
+from typing import Callable, Iterator, Optional, Union
+
+import redis
+from celery import current_task
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+REDIS_URL = env.get('REDIS_URL')
+LEASE_TTL = float(env.get('TASK_LEASE_TTL', 5 * 60))
+PREFIX = 'lease:'
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> Optional[redis.Redis]:
+    global _client
+
+    if _client is None and REDIS_URL:
+        _client = redis.Redis.from_url(
+            REDIS_URL, socket_connect_timeout=1, socket_timeout=1
+        )
+
+    return _client
+
+
+class Lease:
+    renew_script = """
+        local value = redis.call('GET', KEYS[1])
+        if not value or string.sub(value, 1, #ARGV[1]) ~= ARGV[1] then
+            return 0
+        end
+        redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+        return 1
+    """
+    release_script = """
+        local value = redis.call('GET', KEYS[1])
+        if not value or string.sub(value, 1, #ARGV[1]) ~= ARGV[1] then
+            return 0
+        end
+        return redis.call('DEL', KEYS[1])
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float = LEASE_TTL,
+        client: Optional[redis.Redis] = None,
+        task_id: Optional[str] = None,
+    ):
+        self.name = name
+        self.key = f'{PREFIX}{name}'
+        self.ttl = ttl
+        self.client = client or get_redis()
+        self.task_id = task_id
+        self.token = uuid.uuid4().hex
+        self.acquired_at: Optional[float] = None
+        self.renewals = 0
+        self.held = False
+
+    def get_value(self) -> str:
+        return self.token + ':' + json.dumps({
+            'owner': f'{socket.gethostname()}:{os.getpid()}',
+            'task_id': self.task_id,
+            'acquired_at': self.acquired_at,
+            'renewed_at': time.time(),
+            'renewals': self.renewals,
+        })
+
+    def acquire(self) -> bool:
+        if self.client is None:
+            self.held = True
+            return True
+
+        self.acquired_at = time.time()
+
+        try:
+            self.held = bool(self.client.set(
+                self.key, self.get_value(), nx=True, px=int(self.ttl * 1000)
+            ))
+
+        except redis.RedisError as error:
+            logger.warning(f'{self.__class__.__name__} {repr(error)}')
+            self.held = True
+
+        return self.held
+
+    def renew(self) -> bool:
+        if self.client is None or not self.held:
+            return self.held
+
+        self.renewals += 1
+
+        try:
+            self.held = bool(self.client.eval(
+                self.renew_script, 1, self.key,
+                self.token, self.get_value(), int(self.ttl * 1000),
+            ))
+
+        except redis.RedisError as error:
+            logger.warning(f'{self.__class__.__name__} {repr(error)}')
+
+        if not self.held:
+            logger.warning(f'{self.__class__.__name__} {self.name} lost')
+
+        return self.held
+
+    def release(self) -> bool:
+        held, self.held = self.held, False
+
+        if self.client is None or not held:
+            return held
+
+        try:
+            return bool(self.client.eval(
+                self.release_script, 1, self.key, self.token
+            ))
+
+        except redis.RedisError as error:
+            logger.warning(f'{self.__class__.__name__} {repr(error)}')
+            return False
+
+    @contextmanager
+    def keep_alive(self) -> Iterator['Lease']:
+        stopped = threading.Event()
+
+        def renew():
+            while not stopped.wait(self.ttl / 3) and self.renew():
+                pass
+
+        thread = threading.Thread(target=renew, daemon=True)
+        thread.start()
+
+        try:
+            yield self
+
+        finally:
+            stopped.set()
+            thread.join()
+
+
+def mark_pending(name: str, ttl: float = LEASE_TTL) -> bool:
+    client = get_redis()
+
+    if client is None:
+        return False
+
+    try:
+        return bool(client.set(
+            f'{PREFIX}{name}:pending', 1, px=int(ttl * 1000)
+        ))
+
+    except redis.RedisError as error:
+        logger.warning(f'mark_pending {repr(error)}')
+        return False
+
+
+def pop_pending(name: str) -> bool:
+    client = get_redis()
+
+    if client is None:
+        return False
+
+    try:
+        return bool(client.delete(f'{PREFIX}{name}:pending'))
+
+    except redis.RedisError as error:
+        logger.warning(f'pop_pending {repr(error)}')
+        return False
+
+
+def get_leases(pattern: str = '*') -> list[dict]:
+    client = get_redis()
+    leases = []
+
+    if client is None:
+        return leases
+
+    for key in client.scan_iter(f'{PREFIX}{pattern}'):
+        key = key.decode()
+
+        if key.endswith(':pending'):
+            continue
+
+        value = client.get(key)
+
+        if value is None:
+            continue
+
+        lease = json.loads(value.split(b':', 1)[1])
+        lease['name'] = key[len(PREFIX):]
+        lease['ttl'] = client.pttl(key) / 1000
+        lease['pending'] = bool(client.exists(f'{key}:pending'))
+        leases.append(lease)
+
+    return sorted(leases, key=lambda lease: lease['name'])
+
+
+def exclusive(
+    name: Union[str, Callable[..., str]],
+    ttl: float = LEASE_TTL,
+    coalesce: bool = False,
+):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            lease_name = name(*args, **kwargs) if callable(name) else name
+            task_id = current_task.request.id if current_task else None
+            lease = Lease(lease_name, ttl, task_id=task_id)
+
+            if not lease.acquire():
+                if coalesce:
+                    mark_pending(lease_name, ttl)
+
+                logger.info(f'{lease_name} is already running, skipped')
+                return None
+
+            try:
+                with lease.keep_alive():
+                    result = func(*args, **kwargs)
+
+                    while coalesce and pop_pending(lease_name):
+                        logger.info(f'{lease_name} rerun for coalesced call')
+                        result = func(*args, **kwargs)
+
+                    return result
+
+            finally:
+                lease.release()
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,157 @@
+import asyncio
+import os
+import time
+from os import environ as env
+from typing import Optional
+
+import redis
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+REDIS_URL = env.get('REDIS_URL')
+RATE_LIMITS: dict[str, tuple[float, float]] = {
+    'RushydroScraper': (0.2, 1),
+    'EbvuScraper': (1, 2),
+    'RP5Scraper': (0.5, 2),
+    'GismeteoScraper': (5, 10),
+    'RoshydrometScraper': (2, 4),
+}
+
+_limiters: dict[str, 'RateLimiter'] = {}
+_pid = os.getpid()
+
+
+def get_rate_limits() -> dict[str, tuple[float, float]]:
+    limits = dict(RATE_LIMITS)
+
+    for item in env.get('RATE_LIMITS', '').split(','):
+        if '=' not in item:
+            continue
+
+        source, value = item.split('=', 1)
+        rate, _, burst = value.partition(':')
+        limits[source.strip()] = (float(rate), float(burst or 1))
+
+    return limits
+
+
+class RateLimiter:
+    script = """
+        local rate = tonumber(ARGV[1])
+        local burst = tonumber(ARGV[2])
+        local requested = tonumber(ARGV[3])
+        local time = redis.call('TIME')
+        local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+        local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+        local tokens = tonumber(state[1]) or burst
+        local updated_at = tonumber(state[2]) or now
+        tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+        tokens = tokens - requested
+        redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+        redis.call('EXPIRE', KEYS[1], math.ceil((burst - tokens) / rate) + 1)
+        if tokens >= 0 then
+            return '0'
+        end
+        return tostring(-tokens / rate)
+    """
+
+    def __init__(
+        self,
+        source: str,
+        rate: float,
+        burst: float = 1,
+        client: Optional[redis.Redis] = None,
+    ):
+        self.source = source
+        self.rate = rate
+        self.burst = burst
+        self.client = client
+        self.key = f'ratelimit:{source}'
+        self.acquired = 0
+        self.waited = 0
+        self.wait_time = 0.0
+        self.command = client.register_script(self.script) if client else None
+
+    def reserve(self, tokens: float = 1) -> float:
+        if self.command is None or self.rate <= 0:
+            return 0
+
+        try:
+            wait = float(self.command(
+                keys=[self.key], args=[self.rate, self.burst, tokens]
+            ))
+
+        except redis.RedisError as error:
+            logger.warning(f'{self.__class__.__name__} {repr(error)}')
+            return 0
+
+        self.record(wait)
+        return wait
+
+    def record(self, wait: float):
+        self.acquired += 1
+        self.waited += wait > 0
+        self.wait_time += wait
+
+        try:
+            pipeline = self.client.pipeline()
+            pipeline.hincrby(f'{self.key}:metrics', 'acquired', 1)
+            pipeline.hincrby(f'{self.key}:metrics', 'waited', int(wait > 0))
+            pipeline.hincrbyfloat(f'{self.key}:metrics', 'wait_time', wait)
+            pipeline.execute()
+
+        except redis.RedisError as error:
+            logger.warning(f'{self.__class__.__name__} {repr(error)}')
+
+    def acquire(self, tokens: float = 1) -> float:
+        wait = self.reserve(tokens)
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        wait = await asyncio.to_thread(self.reserve, tokens)
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        return wait
+
+    def get_metrics(self) -> dict:
+        try:
+            metrics = self.client.hgetall(f'{self.key}:metrics')
+
+        except (AttributeError, redis.RedisError):
+            metrics = {}
+
+        return {
+            'acquired': int(metrics.get(b'acquired', 0)),
+            'waited': int(metrics.get(b'waited', 0)),
+            'wait_time': float(metrics.get(b'wait_time', 0)),
+        }
+
+    def summary(self) -> str:
+        return (
+            f'{self.source}: {self.acquired} requests, '
+            f'{self.waited} throttled, {self.wait_time:.1f}s waited'
+        )
+
+
+def get_limiter(source: str) -> RateLimiter:
+    global _pid
+
+    if _pid != os.getpid():
+        _limiters.clear()
+        _pid = os.getpid()
+
+    if source not in _limiters:
+        rate, burst = get_rate_limits().get(source, (0, 1))
+        client = redis.Redis.from_url(
+            REDIS_URL, socket_connect_timeout=1, socket_timeout=1
+        ) if REDIS_URL else None
+        _limiters[source] = RateLimiter(source, rate, burst, client)
+
+    return _limiters[source]
@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+from itertools import chain
+from os import environ as env
+from typing import Any, Callable, Hashable
+
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+MODEL_CACHE_SIZE = int(env.get('MODEL_CACHE_SIZE_MB', 1024)) * 1024 ** 2
+
+
+def get_model_size(model: Any) -> int:
+    if not hasattr(model, 'parameters'):
+        return 0
+
+    tensors = chain(model.parameters(), model.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+class ModelCache:
+    def __init__(
+        self,
+        max_size: int = MODEL_CACHE_SIZE,
+        get_size: Callable[[Any], int] = get_model_size,
+    ):
+        self.max_size = max_size
+        self.get_size = get_size
+        self.models: OrderedDict[tuple, tuple[Any, int]] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.RLock()
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self.models
+
+    def __len__(self) -> int:
+        return len(self.models)
+
+    def pop(self, key: tuple):
+        with self.lock:
+            _, size = self.models.pop(key)
+            self.size -= size
+
+    def discard(self, owner: Hashable):
+        with self.lock:
+            for key in [key for key in self.models if key[0] == owner]:
+                self.pop(key)
+
+    def evict(self, size: int):
+        while self.models and self.size + size > self.max_size:
+            key = next(iter(self.models))
+            self.pop(key)
+            self.evictions += 1
+            logger.info(f'{self.__class__.__name__} evicted {key}')
+
+    def get(
+        self, owner: Hashable, version: str, loader: Callable[[], Any]
+    ) -> Any:
+        key = (owner, version)
+
+        with self.lock:
+            if key in self.models:
+                self.models.move_to_end(key)
+                self.hits += 1
+                return self.models[key][0]
+
+            self.misses += 1
+            model = loader()
+            size = self.get_size(model)
+            self.discard(owner)
+
+            if size > self.max_size:
+                logger.warning(
+                    f'{self.__class__.__name__} {key} takes {size} bytes, '
+                    f'more than the budget of {self.max_size}, not cached'
+                )
+                return model
+
+            self.evict(size)
+            self.models[key] = (model, size)
+            self.size += size
+
+            return model
+
+    def clear(self):
+        with self.lock:
+            self.models.clear()
+            self.size = 0
+
+    def summary(self) -> str:
+        return (
+            f'{self.__class__.__name__}: {len(self.models)} models, '
+            f'{self.size / 1024 ** 2:.1f}/{self.max_size / 1024 ** 2:.0f} MB, '
+            f'{self.hits} hits, {self.misses} misses, '
+            f'{self.evictions} evictions'
+        )
+
+
+model_cache = ModelCache()
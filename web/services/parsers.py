@@ -1,9 +1,11 @@
 import re
 import datetime as dt
 from abc import ABCMeta, abstractmethod
-from typing import Iterable, Optional, Union
+from os import environ as env
+from typing import Iterable, NamedTuple, Optional, Union
 
-from bs4 import BeautifulSoup
+import numpy as np
+from bs4 import BeautifulSoup, SoupStrainer
 from bs4.element import NavigableString, Tag
 from celery.utils.log import get_task_logger
 from dateutil.parser import parse as parse_date
@@ -18,6 +20,13 @@ logger = get_task_logger(__name__)
 
 
 class AbstractParser(metaclass=ABCMeta):
+    features: str = env.get('PARSER_FEATURES', 'html.parser')
+    parse_only: Optional[SoupStrainer] = None
+
+    @classmethod
+    def get_soup(cls, page: str) -> BeautifulSoup:
+        return BeautifulSoup(page, cls.features, parse_only=cls.parse_only)
+
     @classmethod
     @abstractmethod
     def parse(cls, *args, **kwargs):
@@ -25,6 +34,7 @@ class AbstractParser(metaclass=ABCMeta):
 
 
 class RushydroParser(AbstractParser):
+    parse_only = SoupStrainer('div', {'data-river': 'Все реки'})
     params = {
         'date': 'water-date',
         'level': 'water-level',
@@ -33,6 +43,7 @@ class RushydroParser(AbstractParser):
         'outflow': 'water-rashod',
         'spillway': 'water-sbros',
     }
+    int_fields = ('free_capacity', 'inflow', 'outflow', 'spillway')
 
     @classmethod
     def get_values(cls, data: Union[Tag, NavigableString]) -> Iterable:
@@ -42,177 +53,295 @@ class RushydroParser(AbstractParser):
     def preprocessing(cls, values: Iterable) -> list[dict]:
         return [dict(zip(cls.params.keys(), i)) for i in values]
 
-    @classmethod
-    def parse(cls, page: str, reservoir: Reservoir) -> list[RushydroSituation]:
-        soup = BeautifulSoup(page, 'html.parser')
-        situations = []
+    @staticmethod
+    def get_dates(
+        values: np.ndarray, today: Optional[dt.date] = None
+    ) -> np.ndarray:
+        parts = np.char.partition(values, '.')
+        days = parts[:, 0].astype(int)
+        months = parts[:, 2].astype(int)
+
+        if ((months < 1) | (months > 12) | (days < 1)).any():
+            raise ValueError('date out of range')
+
+        today = today or dt.date.today()
+        years = today.year - (today.month < months)
+
+        first_days = (
+            (years - 1970).astype('datetime64[Y]')
+            + (months - 1).astype('timedelta64[M]')
+        )
+        dates = (
+            first_days.astype('datetime64[D]')
+            + (days - 1).astype('timedelta64[D]')
+        )
 
-        try:
-            options = soup.find('div', {'data-river': 'Все реки'})
-            option = options.find('option', string=reservoir.station_name)
+        if (dates.astype('datetime64[M]') != first_days).any():
+            raise ValueError('date out of range')
 
-            logger.info(f'{cls.__name__} parsed {reservoir.name}')
+        return dates
 
-            if option:
-                data = cls.preprocessing(cls.get_values(option))
-                situations = parse_obj_as(list[RushydroSituation], data)
+    @classmethod
+    def get_columns(
+        cls,
+        data: Union[Tag, NavigableString],
+        today: Optional[dt.date] = None,
+    ) -> dict[str, np.ndarray]:
+        values = {
+            key: np.array(data[attr].split(',')[::-1])
+            for key, attr in cls.params.items()
+        }
+        size = min(len(value) for value in values.values())
 
-        except (ValueError, AttributeError, ValidationError, KeyError) as e:
-            logger.error(f'{cls.__name__} {repr(e)}')
+        columns = {'date': cls.get_dates(values.pop('date')[:size], today)}
 
-        finally:
-            return situations
+        for key, value in values.items():
+            value = value[:size]
+            is_null = np.char.find(value, 'нет') >= 0
+            columns[key] = np.where(is_null, 'nan', value).astype(float)
 
+        if np.isnan(columns['level']).any():
+            raise ValueError('level is required')
 
-class KrasParser(AbstractParser):
-    @staticmethod
-    def get_values(raw_data: Union[Tag, NavigableString]) -> tuple:
-        level_str = raw_data.find_all(string=re.compile('верхний бьеф'))[2]
-        inflow_str = raw_data.find_all(string=re.compile('приток общий'))[0]
-        spillway_str = raw_data.find_all(string=re.compile('холостой сброс'))[2]  # noqa(E501)
+        for key in cls.int_fields:
+            column = columns[key]
+            if (np.mod(column[~np.isnan(column)], 1) != 0).any():
+                raise ValueError(f'{key} must be integer')
 
-        level = re.findall(r'[0-9]+[,.][0-9]+', level_str)[0]
-        outflow = re.findall(r'[0-9]+', level_str)[-1]
-        inflow = re.findall(r'[0-9]+', inflow_str)[0]
-        spillway = re.findall(r'[0-9]+', spillway_str)[0]
+        return columns
 
-        return level, inflow, outflow, spillway
+    @classmethod
+    def to_columns(
+        cls, situations: list[RushydroSituation]
+    ) -> dict[str, np.ndarray]:
+        columns = {
+            'date': np.array(
+                [situation.date for situation in situations],
+                dtype='datetime64[D]'
+            )
+        }
 
-    @staticmethod
-    def preprocessing(values: Iterable) -> dict:
-        keys = ('level', 'inflow', 'outflow', 'spillway')
-        normalized_values = (float(v.replace(",", ".")) for v in values)
-        return dict(zip(keys, normalized_values))
+        for key in cls.params:
+            if key != 'date':
+                columns[key] = np.array(
+                    [getattr(situation, key) for situation in situations],
+                    dtype=float
+                )
+
+        return columns
 
     @classmethod
-    def parse(cls, page: str, date: dt.date) -> Optional[Situation]:
-        soup = BeautifulSoup(page, 'html.parser')
+    def get_options(cls, page: str) -> list[Tag]:
+        soup = cls.get_soup(page)
+        options = soup.find('div', {'data-river': 'Все реки'})
 
-        try:
-            id_ = f'iul_day_{date.day}'
-            raw_data = soup.find('div', class_='iul_day_1', id=id_)
+        if not options:
+            logger.error(f'{cls.__name__} no content')
+            return []
 
-            logger.info(f'{cls.__name__} parsed date {date}')
+        return [
+            option for option in options.find_all('option') if option.string
+        ]
 
-            if raw_data is None:
-                logger.warning(f'{cls.__name__} Incorrect id: {id_}')
-                return
+    @classmethod
+    def parse_option(
+        cls, option: Tag, today: Optional[dt.date] = None
+    ) -> list[RushydroSituation]:
+        data = cls.preprocessing(cls.get_values(option))
 
-            if raw_data.find(string=re.compile('Нет данных')):
-                logger.info(f'{cls.__name__} No data')
-                return
+        for item in data:
+            item['date'] = RushydroSituation.add_year(item['date'], today)
 
-            normalized_values = cls.preprocessing(cls.get_values(raw_data))
+        return parse_obj_as(list[RushydroSituation], data)
 
-            return Situation(date=date, **normalized_values)
+    @classmethod
+    def parse_all(
+        cls, page: str, today: Optional[dt.date] = None
+    ) -> dict[str, list[RushydroSituation]]:
+        situations = {}
 
-        except (ValueError, AttributeError, ValidationError, IndexError) as e:
-            logger.error(f'{cls.__name__} {repr(e)}')
+        for option in cls.get_options(page):
+            try:
+                situations[option.string] = cls.parse_option(option, today)
+                logger.info(f'{cls.__name__} parsed {option.string}')
 
+            except (ValueError, ValidationError, KeyError) as e:
+                logger.error(f'{cls.__name__} {option.string} {repr(e)}')
 
-class SayanParser(KrasParser):
-    @staticmethod
-    def get_values(raw_data: Union[Tag, NavigableString]) -> tuple:
-        level_str = raw_data.find_all(string=re.compile('верхний бьеф'))[0]
-        inflow_str = raw_data.find_all(string=re.compile('приток'))[0]
-        spillway_str = raw_data.find_all(string=re.compile('холостой сброс'))[0]  # noqa(E501)
+        return situations
 
-        level = re.findall(r'[0-9]+[,.][0-9]+', level_str)[0]
-        outflow = re.findall(r'[0-9]+', level_str)[-1]
-        inflow = re.findall(r'[0-9]+', inflow_str)[0]
-        spillway = re.findall(r'[0-9]+', spillway_str)[0]
+    @classmethod
+    def parse_columns(
+        cls, page: str, today: Optional[dt.date] = None
+    ) -> dict[str, dict[str, np.ndarray]]:
+        columns = {}
 
-        return level, inflow, outflow, spillway
+        for option in cls.get_options(page):
+            try:
+                columns[option.string] = cls.get_columns(option, today)
+                logger.info(f'{cls.__name__} parsed {option.string}')
+                continue
 
+            except (ValueError, KeyError) as e:
+                logger.warning(f'{cls.__name__} {option.string} {repr(e)}')
 
-class MainskParser(KrasParser):
-    @staticmethod
-    def get_values(raw_data: Union[Tag, NavigableString]) -> tuple:
-        level_str = raw_data.find_all(string=re.compile('верхний бьеф'))[1]
-        inflow_str = raw_data.find_all(string=re.compile('средний сброс'))[0]
-        spillway_str = raw_data.find_all(string=re.compile('холостой сброс'))[1]  # noqa(E501)
+            try:
+                situations = cls.parse_option(option, today)
+                columns[option.string] = cls.to_columns(situations)
+                logger.info(f'{cls.__name__} parsed {option.string}')
+
+            except (ValueError, ValidationError, KeyError) as e:
+                logger.error(f'{cls.__name__} {option.string} {repr(e)}')
 
-        level = re.findall(r'[0-9]+[,.][0-9]+', level_str)[0]
-        outflow = re.findall(r'[0-9]+', level_str)[-1]
-        inflow = re.findall(r'[0-9]+', inflow_str)[-1]
-        spillway = re.findall(r'[0-9]+', spillway_str)[0]
+        return columns
 
-        return level, inflow, outflow, spillway
+    @classmethod
+    def parse(cls, page: str, reservoir: Reservoir) -> list[RushydroSituation]:
+        return cls.parse_all(page).get(reservoir.station_name, [])
 
 
-class BratskParser(KrasParser):
-    @staticmethod
-    def preprocessing(values: Iterable) -> dict:
-        keys = ('level', 'inflow', 'outflow')
-        normalized_values = (float(v.replace(",", ".")) for v in values)
-        return dict(zip(keys, normalized_values))
+class EbvuField(NamedTuple):
+    name: str
+    label: str
+    index: int
+    pattern: str = r'[0-9]+'
+    position: int = 0
 
-    @staticmethod
-    def get_values(raw_data: Union[Tag, NavigableString]) -> tuple:
-        level_str = raw_data.find_all(string=re.compile('верхний бьеф'))[3]
-        inflow_str = raw_data.find_all(string=re.compile('приток общий'))[1]
 
-        level = re.findall(r'[0-9]+[,.][0-9]+', level_str)[0]
-        outflow = re.findall(r'[0-9]+', level_str)[-1]
-        inflow = re.findall(r'[0-9]+', inflow_str)[0]
+class EbvuParser(AbstractParser):
+    parse_only = SoupStrainer('div', class_='iul_day_1')
+    no_data = re.compile('Нет данных')
 
-        return level, inflow, outflow
+    def __init__(self, slug: str, fields: Iterable[EbvuField]):
+        self.slug = slug
+        self.fields = tuple(fields)
+        self.patterns: dict[str, re.Pattern] = {}
 
+        for field in self.fields:
+            for pattern in (field.label, field.pattern):
+                if pattern not in self.patterns:
+                    self.patterns[pattern] = re.compile(pattern)
 
-class UstIlimParser(KrasParser):
-    @staticmethod
-    def preprocessing(values: Iterable) -> dict:
-        keys = ('level', 'outflow')
-        normalized_values = (float(v.replace(",", ".")) for v in values)
-        return dict(zip(keys, normalized_values))
+        self.labels = {
+            field.label: self.patterns[field.label] for field in self.fields
+        }
 
-    @staticmethod
-    def get_values(raw_data: Union[Tag, NavigableString]) -> tuple:
-        level_str = raw_data.find_all(string=re.compile('верхний бьеф'))[4]
+    def get_values(self, raw_data: Union[Tag, NavigableString]) -> Optional[dict]:  # noqa(E501)
+        strings = {label: [] for label in self.labels}
 
-        level = re.findall(r'[0-9]+[,.][0-9]+', level_str)[0]
-        outflow = re.findall(r'[0-9]+', level_str)[-1]
+        for string in raw_data.find_all(string=True):
+            if self.no_data.search(string):
+                return
 
-        return level, outflow
+            for label, pattern in self.labels.items():
+                if pattern.search(string):
+                    strings[label].append(string)
 
+        return {
+            field.name: self.patterns[field.pattern].findall(
+                strings[field.label][field.index]
+            )[field.position]
+            for field in self.fields
+        }
 
-class IrkutskParser(KrasParser):
     @staticmethod
-    def preprocessing(values: Iterable) -> dict:
-        keys = ('level', 'outflow')
-        normalized_values = (float(v.replace(",", ".")) for v in values)
-        return dict(zip(keys, normalized_values))
+    def preprocessing(values: dict) -> dict:
+        return {k: float(v.replace(',', '.')) for k, v in values.items()}
 
-    @staticmethod
-    def get_values(raw_data: Union[Tag, NavigableString]) -> tuple:
-        level_str = raw_data.find_all(string=re.compile('средний уровень'))[0]
+    @classmethod
+    def get_days(cls, page: str) -> dict[str, Tag]:
+        soup = cls.get_soup(page)
+        return {
+            day['id']: day
+            for day in soup.find_all('div', class_='iul_day_1', id=True)
+        }
 
-        level = re.findall(r'[0-9]+[,.][0-9]+', level_str)[0]
-        outflow = re.findall(r'[0-9]+', level_str)[-1]
+    def parse_day(
+        self, days: dict[str, Tag], date: dt.date
+    ) -> Optional[Situation]:
+        name = f'{self.__class__.__name__} {self.slug}'
 
-        return level, outflow
+        try:
+            id_ = f'iul_day_{date.day}'
+            raw_data = days.get(id_)
 
+            logger.info(f'{name} parsed date {date}')
 
-class BoguchanParser(KrasParser):
-    @staticmethod
-    def preprocessing(values: Iterable) -> dict:
-        keys = ('level', 'outflow', 'spillway')
-        normalized_values = (float(v.replace(",", ".")) for v in values)
-        return dict(zip(keys, normalized_values))
+            if raw_data is None:
+                logger.warning(f'{name} Incorrect id: {id_}')
+                return
 
-    @staticmethod
-    def get_values(raw_data: Union[Tag, NavigableString]) -> tuple:
-        level_str = raw_data.find_all(string=re.compile('верхний бьеф'))[5]
-        spillway_str = raw_data.find_all(string=re.compile('холостой сброс'))[3]  # noqa(E501)
+            values = self.get_values(raw_data)
+
+            if values is None:
+                logger.info(f'{name} No data')
+                return
 
-        level = re.findall(r'[0-9]+[,.][0-9]+', level_str)[0]
-        outflow = re.findall(r'[0-9]+', level_str)[-1]
-        spillway = re.findall(r'[0-9]+', spillway_str)[0]
+            return Situation(date=date, **self.preprocessing(values))
 
-        return level, outflow, spillway
+        except (ValueError, AttributeError, ValidationError, IndexError) as e:
+            logger.error(f'{name} {repr(e)}')
+
+    def parse_month(
+        self, page: str, dates: Iterable[dt.date]
+    ) -> list[Situation]:
+        days = self.get_days(page)
+        situations = (self.parse_day(days, date) for date in dates)
+        return [situation for situation in situations if situation]
+
+    def parse(self, page: str, date: dt.date) -> Optional[Situation]:
+        return self.parse_day(self.get_days(page), date)
+
+
+LEVEL_PATTERN = r'[0-9]+[,.][0-9]+'
+
+EBVU_SPECS: dict[str, tuple[EbvuField, ...]] = {
+    'kras': (
+        EbvuField('level', 'верхний бьеф', 2, LEVEL_PATTERN),
+        EbvuField('outflow', 'верхний бьеф', 2, position=-1),
+        EbvuField('inflow', 'приток общий', 0),
+        EbvuField('spillway', 'холостой сброс', 2),
+    ),
+    'sayano': (
+        EbvuField('level', 'верхний бьеф', 0, LEVEL_PATTERN),
+        EbvuField('outflow', 'верхний бьеф', 0, position=-1),
+        EbvuField('inflow', 'приток', 0),
+        EbvuField('spillway', 'холостой сброс', 0),
+    ),
+    'mainsk': (
+        EbvuField('level', 'верхний бьеф', 1, LEVEL_PATTERN),
+        EbvuField('outflow', 'верхний бьеф', 1, position=-1),
+        EbvuField('inflow', 'средний сброс', 0, position=-1),
+        EbvuField('spillway', 'холостой сброс', 1),
+    ),
+    'irkutsk': (
+        EbvuField('level', 'средний уровень', 0, LEVEL_PATTERN),
+        EbvuField('outflow', 'средний уровень', 0, position=-1),
+    ),
+    'bratsk': (
+        EbvuField('level', 'верхний бьеф', 3, LEVEL_PATTERN),
+        EbvuField('outflow', 'верхний бьеф', 3, position=-1),
+        EbvuField('inflow', 'приток общий', 1),
+    ),
+    'ust-ilim': (
+        EbvuField('level', 'верхний бьеф', 4, LEVEL_PATTERN),
+        EbvuField('outflow', 'верхний бьеф', 4, position=-1),
+    ),
+    'boguch': (
+        EbvuField('level', 'верхний бьеф', 5, LEVEL_PATTERN),
+        EbvuField('outflow', 'верхний бьеф', 5, position=-1),
+        EbvuField('spillway', 'холостой сброс', 3),
+    ),
+}
+
+EBVU_PARSERS: dict[str, EbvuParser] = {
+    slug: EbvuParser(slug, fields) for slug, fields in EBVU_SPECS.items()
+}
 
 
 class RP5Parser(AbstractParser):
+    parse_only = SoupStrainer('table', id='archiveTable')
+
     @staticmethod
     def get_headlines(first_row: Union[Tag, NavigableString]) -> list[str]:
         return [cell.text for cell in first_row.find_all('td')]
@@ -233,34 +362,55 @@ class RP5Parser(AbstractParser):
     def preprocessing(cls, headlines: list, row: Tag) -> dict:
         return dict(zip(headlines[::-1], cls.get_values(row)[::-1]))
 
+    @staticmethod
+    def get_date(row: Tag) -> Optional[dt.datetime]:
+        date_str = row.find('td', **{'class_': 'cl_dt'})
+
+        if not date_str:
+            return None
+
+        return parse_date(date_str.text, parserinfo=parser_info)
+
     @classmethod
     def get_observations(cls, table: Union[Tag, NavigableString]) -> list[dict]:  # noqa(E501)
-        date_str = table.find('td', **{'class_': 'cl_dt'})
-        date = parse_date(date_str.text, parserinfo=parser_info)
+        date = cls.get_date(table)
 
-        logger.info(f'{cls.__name__} parsed date {date.date()}')
+        if date is None:
+            logger.warning(f'{cls.__name__} no dates in table')
+            return []
 
         headlines = cls.get_headlines(table.find('tr'))
         observations = []
+        dates = set()
         last_hour = 24
 
         for row in table.find('tbody').contents[1:]:
+            if not isinstance(row, Tag):
+                continue
+
             hours = int(row.find('div', **{'class_': 'dfs'}).text)
+            row_date = cls.get_date(row)
+
+            if row_date:
+                date = row_date
 
-            if hours > last_hour:
-                break
+            elif hours > last_hour:
+                date -= dt.timedelta(days=1)
 
             observation = cls.preprocessing(headlines, row)
             observation['date'] = date + dt.timedelta(hours=hours)
             observations.append(observation)
+            dates.add(date.date())
 
             last_hour = hours
 
+        logger.info(f'{cls.__name__} parsed {len(dates)} dates')
+
         return observations
 
     @classmethod
     def parse(cls, page: str) -> list[RP5]:
-        soup = BeautifulSoup(page, 'html.parser')
+        soup = cls.get_soup(page)
         archive_table = soup.find('table', id='archiveTable')
 
         if not archive_table:
@@ -287,12 +437,18 @@ class GismeteoParser(AbstractParser):
 
 
 class RoshydrometParser(AbstractParser):
+    parse_only = SoupStrainer('tbody')
+
     @staticmethod
     def get_values(row: Tag) -> list:
         return re.findall(r'сегодня?|-?[0-9]+|штиль?', row.text, re.I)[-5:]
 
     @classmethod
-    def get_observations(cls, table: Union[Tag, NavigableString]) -> list[dict]:  # noqa(E501)
+    def get_observations(
+        cls,
+        table: Union[Tag, NavigableString],
+        today: Optional[dt.date] = None,
+    ) -> list[dict]:
         keys = (
             'temp',
             'pressure',
@@ -306,7 +462,7 @@ class RoshydrometParser(AbstractParser):
             'днем': 13,
         }
 
-        date = dt.date.today()
+        date = today or dt.date.today()
         forecasts = []
 
         for row in table.find_all('tr'):
@@ -326,8 +482,10 @@ class RoshydrometParser(AbstractParser):
         return forecasts
 
     @classmethod
-    def parse(cls, page: str) -> list[Roshydromet]:
-        soup = BeautifulSoup(page, 'html.parser')
+    def parse(
+        cls, page: str, today: Optional[dt.date] = None
+    ) -> list[Roshydromet]:
+        soup = cls.get_soup(page)
         forecast_table = soup.find('tbody')
 
         if not forecast_table:
@@ -335,7 +493,7 @@ class RoshydrometParser(AbstractParser):
             return []
 
         try:
-            forecasts = cls.get_observations(forecast_table)
+            forecasts = cls.get_observations(forecast_table, today)
             return parse_obj_as(list[Roshydromet], forecasts)
 
         except (AttributeError, ValidationError, IndexError) as error:
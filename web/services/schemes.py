@@ -89,8 +89,17 @@ class Situation(BaseModel):
 
 
 class RushydroSituation(Situation):
+    @staticmethod
+    def add_year(value: str, today: Optional[dt.date] = None) -> str:
+        if value.count('.') != 1:
+            return value
+
+        today = today or dt.date.today()
+        year = today.year - (today.month < int(value.split('.')[-1]))
+        return f'{value}.{year}'
+
     @validator('date', pre=True)
     def parsedate(cls, value):
-        today = dt.date.today()
-        year = today.year - (today.month < int(value.split('.')[-1]))
-        return parse_date(f'{value}.{year}', dayfirst=True)
+        if isinstance(value, str):
+            value = cls.add_year(value)
+        return parse_date(value, dayfirst=True)
@@ -1,25 +1,40 @@
+import asyncio
 import datetime as dt
+import json
 import time
 from abc import ABCMeta, abstractmethod
 from os import environ as env
-from typing import Optional
+from typing import Any, Iterable, Optional
 
 import httpx
+import numpy as np
 from celery.utils.log import get_task_logger
-from django.db import DatabaseError
 from django.db.models import manager
-from selenium import webdriver
-from selenium.common.exceptions import WebDriverException
+from selenium.common.exceptions import (NoSuchElementException,
+                                        TimeoutException,
+                                        UnexpectedTagNameException,
+                                        WebDriverException)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.remote.webdriver import WebDriver
-
-from reservoirs.models import Reservoir, WaterSituation
-from services.parsers import (AbstractParser, GismeteoParser,
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.select import Select
+
+from reservoirs.models import Reservoir
+from services.archive import PageArchive
+from services.browsers import Waiter, get_pool
+from services.cache import PageCache
+from services.clients import get_async_client, get_client
+from services.limits import RateLimiter, get_limiter
+from services.parsers import (EBVU_PARSERS, AbstractParser,
+                              EbvuParser, GismeteoParser,
                               RoshydrometParser, RP5Parser,
                               RushydroParser, Situation)
 from services.schemes import WeatherBase
-from weather.models import GeoObject, Weather
+from services.writers import (SituationWriter, UpsertWriter, WeatherWriter,
+                              get_checkpoints, get_watermarks,
+                              is_checkpointed, seed_watermark)
+from weather.models import GeoObject
 
 logger = get_task_logger(__name__)
 
@@ -27,6 +42,7 @@ logger = get_task_logger(__name__)
 class AbstractScraper(metaclass=ABCMeta):
     parser: AbstractParser
     base_url: str
+    writer_class: type[UpsertWriter]
 
     @classmethod
     @abstractmethod
@@ -38,36 +54,68 @@ class AbstractScraper(metaclass=ABCMeta):
     def scrape(cls):
         pass
 
+    @classmethod
+    @abstractmethod
+    def parse_content(
+        cls, content: str, date: dt.date, target: Optional[int] = None
+    ) -> Any:
+        pass
+
+    @classmethod
+    @abstractmethod
+    def save_content(
+        cls, writer: UpsertWriter, parsed: Any, target: Optional[int] = None
+    ):
+        pass
+
+    @classmethod
+    def get_writer(cls) -> UpsertWriter:
+        return cls.writer_class(source=cls.__name__)
+
+    @classmethod
+    def get_archive(cls) -> PageArchive:
+        return PageArchive(cls.__name__)
+
+    @classmethod
+    def get_limiter(cls) -> RateLimiter:
+        return get_limiter(cls.__name__)
+
 
 class SituationMixin(AbstractScraper):
+    writer_class = SituationWriter
+
     @classmethod
-    def get_page(cls, *args, **kwargs) -> str:
+    def get_page(
+        cls,
+        *args,
+        cache: Optional[PageCache] = None,
+        wanted: Optional[str] = None,
+        **kwargs,
+    ) -> Optional[str]:
         url = cls.get_url(*args, **kwargs)
+        headers = cache.get_headers(url, wanted) if cache else {}
 
-        with httpx.Client() as client:
-            response = client.get(url, follow_redirects=True)
+        cls.get_limiter().acquire()
+        response = get_client().get(url, headers=headers)
 
         if response.is_error:
             raise httpx.HTTPError(
                 f'{response.status_code} {response.reason_phrase}')
 
+        if cache and not cache.is_modified(url, response, wanted):
+            return None
+
         return response.text
 
     @classmethod
-    def save(
-        cls, date: dt.date, situation: Situation, reservoir: Reservoir
-    ) -> tuple[Optional[WaterSituation], bool]:
-        try:
-            obj, created = WaterSituation.objects.get_or_create(
-                date=date,
-                reservoir=reservoir,
-                defaults=situation.dict()
-            )
-            return obj, created
+    def save_all(
+        cls, situations: Iterable[tuple[Reservoir, Situation]]
+    ) -> SituationWriter:
+        with cls.get_writer() as writer:
+            for reservoir, situation in situations:
+                writer.add(situation, reservoir)
 
-        except DatabaseError as error:
-            logger.error(f'{cls.__name__} {repr(error)}')
-            return None, False
+        return writer
 
 
 class RushydroScraper(SituationMixin):
@@ -76,18 +124,18 @@ class RushydroScraper(SituationMixin):
         'RUSHYDRO_URL', 'https://www.rushydro.ru/informer/'
     )
 
-    @staticmethod
-    def get_driver() -> WebDriver:
-        options = webdriver.FirefoxOptions()
-        options.add_argument('--headless')
-        options.add_argument("--enable-javascript")
-        selenium_url = env.get('SELENIUM_URL', 'http://selenium:4444/wd/hub')
-        return webdriver.Remote(selenium_url, options=options)
+    options_locator = (
+        By.CSS_SELECTOR, 'div[data-river="Все реки"] option[water-date]'
+    )
 
     @classmethod
-    def get_page(cls, driver: WebDriver) -> str:
+    def get_page(cls, driver: WebDriver, waiter: Waiter) -> str:
+        cls.get_limiter().acquire()
         driver.get(cls.get_url())
-        time.sleep(3)
+        waiter.until(
+            'rushydro_options',
+            EC.presence_of_element_located(cls.options_locator),
+        )
         return driver.page_source
 
     @classmethod
@@ -95,41 +143,70 @@ class RushydroScraper(SituationMixin):
         return cls.base_url
 
     @classmethod
-    def scrape(cls):
-        logger.info(f'{cls.__name__} start scraping')
-
-        reservoirs = Reservoir.objects.filter(
+    def get_objects(cls) -> manager.BaseManager[Reservoir]:
+        return Reservoir.objects.filter(
             station_name__isnull=False
         ).exclude(
             slug='kras'
         ).all()
 
-        saved_count = 0
-        driver = cls.get_driver()
+    @classmethod
+    def parse_content(
+        cls, content: str, date: dt.date, target: Optional[int] = None
+    ) -> dict[str, dict[str, np.ndarray]]:
+        return cls.parser.parse_columns(content, today=date)
 
-        try:
-            page = cls.get_page(driver)
+    @classmethod
+    def save_content(
+        cls,
+        writer: SituationWriter,
+        parsed: dict[str, dict[str, np.ndarray]],
+        target: Optional[int] = None,
+    ):
+        for reservoir in cls.get_objects():
+            series = parsed.get(reservoir.station_name)
+
+            if series:
+                writer.add_series(series, reservoir)
+
+    @classmethod
+    def scrape(cls):
+        logger.info(f'{cls.__name__} start scraping')
 
-            for reservoir in reservoirs:
-                situations = cls.parser.parse(page, reservoir)
+        columns = {}
+        cache = PageCache(cls.__name__)
 
-                for situation in situations:
-                    _, saved = cls.save(situation.date, situation, reservoir)
-                    saved_count += saved
+        try:
+            with get_pool().lease() as driver:
+                waiter = Waiter(driver)
+                page = cls.get_page(driver, waiter)
+                logger.info(f'{cls.__name__} waits: {waiter.summary()}')
 
-        except WebDriverException as error:
+            if cache.is_changed(cls.get_url(), page):
+                cls.get_archive().put(cls.get_url(), page)
+                columns = cls.parse_content(page, dt.date.today())
+
+        except (WebDriverException, TimeoutError) as error:
             logger.error(f'Some error occured: {error!r}')
 
-        finally:
-            driver.quit()
+        with cls.get_writer() as writer:
+            cls.save_content(writer, columns)
 
-        logger.info(f'{cls.__name__} saved {saved_count} new objs')
+        if not writer.failed:
+            cache.save()
+
+        logger.info(f'{cls.__name__} saved {writer.inserted} new objs')
+        logger.info(f'{cls.__name__} updated {writer.updated} objs')
+        logger.info(f'{cls.__name__} skipped {cache.skipped} pages')
+        logger.info(f'{cls.__name__} {cls.get_limiter().summary()}')
         logger.info(f'{cls.__name__} stop scraping')
 
 
 class EbvuScraper(SituationMixin):
     first_date = dt.date(2021, 7, 1)
     base_url = env.get('EBVU_URL', 'https://enbvu.ru/i03_deyatelnost')
+    max_lag_days: int = int(env.get('EBVU_MAX_LAG_DAYS', 62))
+    parsers: dict[str, EbvuParser] = EBVU_PARSERS
     month_names: dict = {
         1: 'jan',
         2: 'feb',
@@ -145,18 +222,41 @@ class EbvuScraper(SituationMixin):
         12: 'dec',
     }
 
-    def __init__(self, parser: AbstractParser, reservoir_slug: str):
-        self.parser = parser
-        self.slug = reservoir_slug
+    @classmethod
+    def get_objects(cls) -> manager.BaseManager[Reservoir]:
+        return Reservoir.objects.filter(slug__in=cls.parsers.keys()).all()
 
-    def get_date(self):
-        try:
-            last_situation = WaterSituation.objects.filter(
-                reservoir__slug=self.slug).latest('date')
-            return last_situation.date + dt.timedelta(days=1)
+    @classmethod
+    def get_dates(cls, reservoirs: Iterable[Reservoir]) -> dict[str, dt.date]:
+        last_dates = get_watermarks(
+            cls.__name__, [reservoir.id for reservoir in reservoirs]
+        )
+        return {
+            reservoir.slug: last_dates[reservoir.id] + dt.timedelta(days=1)
+            if reservoir.id in last_dates else cls.first_date
+            for reservoir in reservoirs
+        }
+
+    @classmethod
+    def get_start_date(cls, start_dates: dict[str, dt.date]) -> dt.date:
+        lag_limit = (
+            max(start_dates.values()) - dt.timedelta(days=cls.max_lag_days)
+        )
+        lagging = sorted(
+            slug for slug, date in start_dates.items()
+            if cls.first_date < date < lag_limit
+        )
 
-        except WaterSituation.DoesNotExist:
-            return self.first_date
+        if lagging:
+            logger.warning(
+                f'{cls.__name__} {", ".join(lagging)} lag behind '
+                f'{lag_limit}, left to the gap backfill'
+            )
+
+        return min(
+            date if date == cls.first_date else max(date, lag_limit)
+            for date in start_dates.values()
+        )
 
     @classmethod
     def get_url(cls, date: dt.date) -> str:
@@ -168,150 +268,450 @@ class EbvuScraper(SituationMixin):
             page_number, cls.month_names[date.month]
         )
 
-    def scrape(self):
-        logger.info(f'{self.__class__.__name__} start scraping')
-        reservoir = Reservoir.objects.get(slug=self.slug)
+    @staticmethod
+    def get_wanted(
+        dates: list[dt.date], start_dates: dict[str, dt.date]
+    ) -> str:
+        return ','.join(
+            f'{slug}:{max(start_date, dates[0]):%Y%m%d}'
+            for slug, start_date in sorted(start_dates.items())
+            if start_date <= dates[-1]
+        )
+
+    @staticmethod
+    def get_month_dates(date: dt.date, last_date: dt.date) -> list[dt.date]:
+        next_month = date.replace(day=28) + dt.timedelta(days=4)
+        month_end = next_month - dt.timedelta(days=next_month.day)
+        end_date = min(month_end, last_date)
+        return [
+            date + dt.timedelta(days=i)
+            for i in range((end_date - date).days + 1)
+        ]
+
+    @classmethod
+    def parse_page(
+        cls,
+        page: str,
+        dates: list[dt.date],
+        start_dates: Optional[dict[str, dt.date]] = None,
+    ) -> dict[str, list[Situation]]:
+        days = EbvuParser.get_days(page)
+        situations = {}
+
+        for slug, parser in cls.parsers.items():
+            start_date = (start_dates or {}).get(slug, dates[0])
+            situations[slug] = []
+
+            for date in dates:
+                if date < start_date:
+                    continue
+
+                situation = parser.parse_day(days, date)
+
+                if situation:
+                    situations[slug].append(situation)
+
+        return situations
+
+    @classmethod
+    def parse_content(
+        cls, content: str, date: dt.date, target: Optional[int] = None
+    ) -> dict[str, list[Situation]]:
+        dates = cls.get_month_dates(date.replace(day=1), dt.date.today())
+        return cls.parse_page(content, dates)
+
+    @classmethod
+    def save_content(
+        cls,
+        writer: SituationWriter,
+        parsed: dict[str, list[Situation]],
+        target: Optional[int] = None,
+    ):
+        for reservoir in cls.get_objects():
+            for situation in parsed.get(reservoir.slug, []):
+                writer.add(situation, reservoir)
+
+    @classmethod
+    def backfill(
+        cls, month: dt.date, gaps: dict[int, Iterable[dt.date]]
+    ) -> dict:
+        url = cls.get_url(month)
+        page = cls.get_page(date=month)
+        cls.get_archive().put(url, page, date=month)
+
+        wanted = {
+            (target, date) for target, dates in gaps.items() for date in dates
+        }
+        parsed = cls.parse_content(page, month)
+
+        with cls.get_writer() as writer:
+            for reservoir in cls.get_objects().filter(id__in=gaps):
+                for situation in parsed.get(reservoir.slug, []):
+                    if (reservoir.id, situation.date) in wanted:
+                        writer.add(situation, reservoir)
+
+        logger.info(
+            f'{cls.__name__} backfill {month:%Y-%m}: {len(wanted)} dates, '
+            f'{writer.inserted} new objs'
+        )
+        return {'inserted': writer.inserted, 'updated': writer.updated}
+
+    @classmethod
+    def scrape(cls):
+        logger.info(f'{cls.__name__} start scraping')
 
-        date = self.get_date()
+        reservoirs = list(cls.get_objects())
+        logger.info(f'Get {len(reservoirs)} reservoirs')
 
-        while date <= date.today():
-            page = self.get_page(date=date)
-            situation = self.parser.parse(page, date)
+        if not reservoirs:
+            return
 
-            if situation:
-                obj, saved = self.save(date, situation, reservoir)
+        start_dates = cls.get_dates(reservoirs)
+        date = cls.get_start_date(start_dates)
+        today = dt.date.today()
+        cache = PageCache(cls.__name__)
+        archive = cls.get_archive()
+        situations = []
 
-                if saved:
-                    logger.info(
-                        f'{self.__class__.__name__} saved new obj: {obj}'
+        try:
+            while date <= today:
+                dates = cls.get_month_dates(date, today)
+                page = cls.get_page(
+                    date=date,
+                    cache=cache,
+                    wanted=cls.get_wanted(dates, start_dates),
+                )
+
+                if page is not None:
+                    archive.put(cls.get_url(date), page, date=date)
+                    parsed = cls.parse_page(page, dates, start_dates)
+
+                    situations.extend(
+                        (reservoir, situation)
+                        for reservoir in reservoirs
+                        for situation in parsed[reservoir.slug]
                     )
 
-            date += dt.timedelta(days=1)
+                date = dates[-1] + dt.timedelta(days=1)
+
+        finally:
+            writer = cls.save_all(situations)
+
+            if not writer.failed:
+                cache.save()
 
-        logger.info(f'{self.__class__.__name__} stop scraping')
+            logger.info(f'{cls.__name__} saved {writer.inserted} new objs')
+            logger.info(f'{cls.__name__} updated {writer.updated} objs')
+            logger.info(f'{cls.__name__} skipped {cache.skipped} pages')
+            logger.info(f'{cls.__name__} {cls.get_limiter().summary()}')
+
+        logger.info(f'{cls.__name__} stop scraping')
 
 
 class RP5Scraper(AbstractScraper):
     first_date: dt.date = dt.date(2005, 2, 1)
     parser: RP5Parser = RP5Parser()
+    writer_class = WeatherWriter
     base_url: str = env.get('RP5_URL', 'https://rp5.ru/Архив_погоды_в_Бее')
-
-    @staticmethod
-    def get_driver() -> WebDriver:
-        options = webdriver.FirefoxOptions()
-        options.add_argument('--headless')
-        selenium_url = env.get('SELENIUM_URL', 'http://selenium:4444/wd/hub')
-        return webdriver.Remote(selenium_url, options=options)
+    archive_url: str = env.get(
+        'RP5_ARCHIVE_URL', 'https://rp5.ru/archive.php'
+    )
+    range_days: int = int(env.get('RP5_RANGE_DAYS', 7))
+    period_locator: tuple[str, str] = (
+        By.CSS_SELECTOR, env.get('RP5_PERIOD_SELECTOR', '#period')
+    )
 
     @classmethod
     def get_objects(cls) -> manager.BaseManager[GeoObject]:
         return GeoObject.objects.filter(station_id__isnull=False).all()
 
     @classmethod
-    def get_last_date(cls, geo_object):
-        try:
-            last_observed_weather = Weather.objects.filter(
-                geo_object=geo_object,
-                is_observable=True
-            ).latest(
-                'date'
-            )
-            return last_observed_weather.date.date()
+    def get_writer(cls) -> WeatherWriter:
+        return cls.writer_class(source=cls.__name__, contiguous=True)
 
-        except Weather.DoesNotExist:
-            return cls.first_date
+    @classmethod
+    def get_last_date(cls, geo_object: GeoObject) -> dt.date:
+        return get_watermarks(cls.__name__, [geo_object.id]).get(
+            geo_object.id, cls.first_date
+        )
 
     @classmethod
     def get_url(cls) -> str:
         return cls.base_url
 
     @classmethod
-    def load_geo_object_page(cls, driver: WebDriver, geo_object: GeoObject):
-        station_id_input_element = driver.find_element(By.ID, 'wmo_id')
+    def get_station_url(cls, geo_object: GeoObject) -> str:
+        return f'{cls.archive_url}?wmo_id={geo_object.station_id}&lang=ru'
+
+    @classmethod
+    def load_geo_object_page(
+        cls, driver: WebDriver, geo_object: GeoObject, waiter: Waiter
+    ):
+        cls.get_limiter().acquire()
+        driver.get(cls.get_station_url(geo_object))
+
+        try:
+            waiter.until(
+                'rp5_station_url',
+                EC.element_to_be_clickable((By.ID, 'calender_archive')),
+            )
+            return
+
+        except TimeoutException:
+            logger.warning(f'{cls.__name__} no direct page for {geo_object}')
+
+        cls.get_limiter().acquire()
+        driver.get(cls.base_url)
+        station_id_input_element = waiter.until(
+            'rp5_station_input',
+            EC.element_to_be_clickable((By.ID, 'wmo_id')),
+        )
 
         station_id_input_element.clear()
         station_id_input_element.send_keys(geo_object.station_id)
-        time.sleep(3)
-
         station_id_input_element.send_keys(Keys.ENTER)
-        time.sleep(3)
+
+        waiter.until(
+            'rp5_station_form', EC.staleness_of(station_id_input_element)
+        )
+        waiter.until(
+            'rp5_station_form',
+            EC.element_to_be_clickable((By.ID, 'calender_archive')),
+        )
+
+    @classmethod
+    def select_period(cls, driver: WebDriver, days: int) -> int:
+        if days <= 1:
+            return 1
+
+        try:
+            period = Select(driver.find_element(*cls.period_locator))
+            period.select_by_value(str(days))
+            return days
+
+        except (NoSuchElementException, UnexpectedTagNameException) as error:
+            logger.warning(f'{cls.__name__} no period select: {error!r}')
+            return 1
+
+    @staticmethod
+    def get_end_date(date: dt.date, days: int, today: dt.date) -> dt.date:
+        return min(date + dt.timedelta(days=days - 1), today)
 
     @classmethod
-    def get_page(cls, driver: WebDriver, date: dt.date) -> str:
+    def get_page(
+        cls, driver: WebDriver, date: dt.date, waiter: Waiter
+    ) -> str:
         date_picker = driver.find_element(By.ID, 'calender_archive')
         date_button = driver.find_element(By.CLASS_NAME, 'archButton')
+        old_tables = driver.find_elements(By.ID, 'archiveTable')
 
         date_picker.clear()
         date_picker.send_keys(date.strftime('%d.%m.%Y'))
 
+        cls.get_limiter().acquire()
         date_button.click()
 
+        if old_tables:
+            waiter.until('rp5_table', EC.staleness_of(old_tables[0]))
+
+        waiter.until(
+            'rp5_table',
+            EC.presence_of_element_located((By.ID, 'archiveTable')),
+        )
+
         return driver.page_source
 
     @classmethod
-    def save(
-        cls, forecast: WeatherBase, geo_object: GeoObject
-    ) -> tuple[Optional[Weather], bool]:
-        try:
-            obj, created = Weather.objects.update_or_create(
-                date=forecast.date,
-                geo_object=geo_object,
-                is_observable=True,
-                defaults=forecast.dict()
-            )
-            return obj, created
+    def parse_content(
+        cls, content: str, date: dt.date, target: Optional[int] = None
+    ) -> list[WeatherBase]:
+        return cls.parser.parse(content)
+
+    @classmethod
+    def save_content(
+        cls,
+        writer: WeatherWriter,
+        parsed: list[WeatherBase],
+        target: Optional[int] = None,
+    ):
+        geo_object = GeoObject(pk=target)
 
-        except DatabaseError as error:
-            logger.error(f'{cls.__name__} {repr(error)}')
-            return None, False
+        for forecast in parsed:
+            writer.add(forecast, geo_object)
 
     @classmethod
-    def scrape(cls):
-        logger.info(f'{cls.__name__} start scraping')
+    def get_chunks(
+        cls, geo_object: GeoObject, chunk_days: Optional[int] = None
+    ) -> list[tuple[Optional[dt.date], Optional[dt.date]]]:
+        if not chunk_days:
+            return [(None, None)]
+
+        date = cls.get_last_date(geo_object)
+        today = dt.date.today()
+        chunks = []
+
+        seed_watermark(
+            cls.__name__, geo_object.id, date - dt.timedelta(days=1)
+        )
 
-        geo_objects = cls.get_objects()
-        logger.info(f'Get {len(geo_objects)} geo objects')
+        while date <= today:
+            end_date = cls.get_end_date(date, chunk_days, today)
+            chunks.append((date, end_date))
+            date = end_date + dt.timedelta(days=1)
 
-        driver = cls.get_driver()
+        return chunks
 
-        try:
-            driver.get(cls.base_url)
+    @staticmethod
+    def get_missing_dates(
+        parsed: list[WeatherBase], start: dt.date, end: dt.date
+    ) -> list[dt.date]:
+        dates = {observation.date.date() for observation in parsed}
+        return [
+            start + dt.timedelta(days=i)
+            for i in range((end - start).days + 1)
+            if start + dt.timedelta(days=i) not in dates
+        ]
 
-            for geo_object in geo_objects:
-                cls.load_geo_object_page(driver, geo_object)
-                logger.info(f'Get page for {geo_object}')
+    @classmethod
+    def scrape_object(
+        cls,
+        driver: WebDriver,
+        waiter: Waiter,
+        writer: WeatherWriter,
+        geo_object: GeoObject,
+        start: Optional[dt.date] = None,
+        end: Optional[dt.date] = None,
+        resume: bool = False,
+    ) -> int:
+        cls.load_geo_object_page(driver, geo_object, waiter)
+        logger.info(f'Get page for {geo_object}')
+
+        last_date = start or cls.get_last_date(geo_object)
+        logger.info(f'Last date: {last_date}')
+
+        if start is None:
+            seed_watermark(
+                cls.__name__, geo_object.id, last_date - dt.timedelta(days=1)
+            )
+
+        archive = cls.get_archive()
+        url = cls.get_station_url(geo_object)
+        checkpoints = (
+            get_checkpoints(cls.__name__, geo_object.id)
+            if resume or (start is None and end is None) else []
+        )
+        days = cls.range_days
+        requests = 0
+        today = min(end or dt.date.today(), dt.date.today())
+
+        while last_date <= today:
+            end_date = cls.get_end_date(last_date, days, today)
+
+            if is_checkpointed(checkpoints, last_date, end_date):
+                logger.info(f'{geo_object}: skip {last_date} - {end_date}')
+                last_date = end_date + dt.timedelta(days=1)
+                continue
+
+            days = cls.select_period(driver, days)
+            end_date = cls.get_end_date(last_date, days, today)
+
+            try:
+                page = cls.get_page(driver, end_date, waiter)
+
+            except TimeoutException as error:
+                logger.warning(
+                    f'{geo_object}: no archive table for '
+                    f'{last_date} - {end_date} {error!r}'
+                )
+                last_date = end_date + dt.timedelta(days=1)
+                requests += 1
+                continue
+
+            archive.put(url, page, date=last_date, target=geo_object.id)
+            parsed = cls.parse_content(page, last_date)
+            cls.save_content(writer, parsed, target=geo_object.id)
 
-                last_date = cls.get_last_date(geo_object)
-                logger.info(f'Last date: {last_date}')
+            missing = cls.get_missing_dates(parsed, last_date, end_date)
 
-                while last_date <= dt.date.today():
-                    saved_count = 0
+            if missing:
+                logger.info(
+                    f'{geo_object}: {len(missing)} dates missing in '
+                    f'{last_date} - {end_date}'
+                )
 
-                    page = cls.get_page(driver, last_date)
-                    forecasts = cls.parser.parse(page)
+            elif end_date < dt.date.today():
+                writer.add_checkpoint(geo_object.id, last_date, end_date)
 
-                    for forecast in forecasts:
-                        _, saved = cls.save(forecast, geo_object)
-                        saved_count += saved
+            last_date = end_date + dt.timedelta(days=1)
+            requests += 1
 
-                    logger.info(f'{cls.__name__} saved {saved_count} new objs')
+        logger.info(f'{geo_object}: {requests} archive requests')
 
-                    last_date += dt.timedelta(days=1)
+        writer.flush()
+        return requests
 
-        except WebDriverException as error:
+    @classmethod
+    def scrape_geo_object(
+        cls,
+        geo_object_id: int,
+        start: Optional[dt.date] = None,
+        end: Optional[dt.date] = None,
+        resume: bool = False,
+        interrupts: tuple[type[BaseException], ...] = (),
+    ) -> dict:
+        started_at = time.monotonic()
+        geo_object = GeoObject.objects.get(pk=geo_object_id)
+        writer = cls.get_writer()
+        requests = 0
+        interrupted = False
+
+        try:
+            with get_pool().lease() as driver:
+                waiter = Waiter(driver)
+                requests = cls.scrape_object(
+                    driver, waiter, writer, geo_object, start, end, resume
+                )
+                logger.info(f'{cls.__name__} waits: {waiter.summary()}')
+
+        except (WebDriverException, TimeoutError) as error:
             logger.error(f'Some error occured: {error!r}')
 
+        except interrupts as error:
+            logger.warning(f'{geo_object} interrupted: {error!r}')
+            interrupted = True
+
         finally:
-            driver.quit()
+            writer.flush()
+
+        return {
+            'geo_object': geo_object_id,
+            'requests': requests,
+            'inserted': writer.inserted,
+            'updated': writer.updated,
+            'failed': writer.failed,
+            'interrupted': interrupted,
+            'seconds': time.monotonic() - started_at,
+        }
 
-        logger.info(f'{cls.__name__} stop scraping')
+    @classmethod
+    def scrape(
+        cls, chunk_days: Optional[int] = None
+    ) -> list[tuple[int, Optional[dt.date], Optional[dt.date]]]:
+        return [
+            (geo_object.id, start, end)
+            for geo_object in cls.get_objects()
+            for start, end in cls.get_chunks(geo_object, chunk_days)
+        ]
 
 
 class GismeteoScraper(AbstractScraper):
     parser: GismeteoParser = GismeteoParser()
+    writer_class = WeatherWriter
     base_url: str = env.get(
         'GIS_URL', 'https://api.gismeteo.net/v2/weather/forecast'
     )
+    verify: bool = True
+    concurrency: int = int(env.get('SCRAPER_CONCURRENCY', 8))
 
     @classmethod
     def get_objects(cls) -> manager.BaseManager[GeoObject]:
@@ -322,63 +722,120 @@ class GismeteoScraper(AbstractScraper):
         return f'{cls.base_url}/{geo_object.gismeteo_id}/'
 
     @classmethod
-    def get_data(cls, geo_object: GeoObject) -> dict:
+    async def get_data(
+        cls,
+        client: httpx.AsyncClient,
+        geo_object: GeoObject,
+        cache: PageCache,
+    ) -> Optional[str]:
         url = cls.get_url(geo_object)
         params = {
             'days': 10,
         }
         headers = {
             'X-Gismeteo-Token': env['GIS_TOKEN'],
-            'Accept-Encoding': 'gzip',
+            **cache.get_headers(url),
         }
 
-        response = httpx.get(url=url, params=params, headers=headers)
+        await cls.get_limiter().acquire_async()
+        response = await client.get(url=url, params=params, headers=headers)
 
         if response.is_error:
             raise httpx.HTTPError(
                 f'{response.status_code} {response.reason_phrase}')
 
-        return response.json()
+        if not cache.is_modified(url, response):
+            return None
+
+        return response.text
 
     @classmethod
-    def save(
-            cls, forecast: WeatherBase, geo_object: GeoObject
-            ) -> tuple[Optional[Weather], bool]:
-        try:
-            obj, created = Weather.objects.update_or_create(
-                date=forecast.date,
-                geo_object=geo_object,
-                is_observable=False,
-                defaults=forecast.dict()
-            )
-            return obj, created
+    def parse_content(
+        cls, content: str, date: dt.date, target: Optional[int] = None
+    ) -> list[WeatherBase]:
+        return cls.parser.parse(json.loads(content))
+
+    @classmethod
+    def save_content(
+        cls,
+        writer: WeatherWriter,
+        parsed: list[WeatherBase],
+        target: Optional[int] = None,
+    ):
+        geo_object = GeoObject(pk=target)
 
-        except DatabaseError as error:
-            logger.error(f'{cls.__name__} {repr(error)}')
-            return None, False
+        for forecast in parsed:
+            writer.add(forecast, geo_object)
+
+    @classmethod
+    async def fetch(
+        cls,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        geo_object: GeoObject,
+        cache: PageCache,
+    ) -> tuple[GeoObject, Optional[str], list[WeatherBase]]:
+        async with semaphore:
+            content = await cls.get_data(client, geo_object, cache)
+
+        if content is None:
+            return geo_object, None, []
+
+        parsed = cls.parse_content(content, dt.date.today(), geo_object.id)
+        return geo_object, content, parsed
+
+    @classmethod
+    async def fetch_all(
+        cls, geo_objects: Iterable[GeoObject], cache: PageCache
+    ) -> list[tuple[GeoObject, Optional[str], list[WeatherBase]]]:
+        semaphore = asyncio.Semaphore(cls.concurrency)
+        results = []
+
+        async with get_async_client(cls.verify, cls.concurrency) as client:
+            tasks = [
+                cls.fetch(client, semaphore, geo_object, cache)
+                for geo_object in geo_objects
+            ]
+
+            for task in asyncio.as_completed(tasks):
+                try:
+                    results.append(await task)
+
+                except (httpx.HTTPError, ValueError) as error:
+                    logger.error(f'Some error occured: {error!r}')
+
+        return results
 
     @classmethod
     def scrape(cls):
         logger.info(f'{cls.__name__} start scraping')
 
-        geo_objects = cls.get_objects()
+        geo_objects = list(cls.get_objects())
         logger.info(f'Get {len(geo_objects)} geo objects')
 
-        saved_count = 0
-
-        for geo_object in geo_objects:
-            try:
-                data = cls.get_data(geo_object)
-                forecasts = cls.parser.parse(data)
+        cache = PageCache(
+            cls.__name__, [cls.get_url(obj) for obj in geo_objects]
+        )
+        results = asyncio.run(cls.fetch_all(geo_objects, cache))
+        archive = cls.get_archive()
+
+        with cls.get_writer() as writer:
+            for geo_object, content, forecasts in results:
+                if content is not None:
+                    archive.put(
+                        cls.get_url(geo_object), content,
+                        target=geo_object.id,
+                    )
 
-                for forecast in forecasts:
-                    _, saved = cls.save(forecast, geo_object)
-                    saved_count += saved
+                cls.save_content(writer, forecasts, target=geo_object.id)
 
-            except httpx.HTTPError as error:
-                logger.error(f'Some error occured: {error!r}')
+        if not writer.failed:
+            cache.save()
 
-        logger.info(f'{cls.__name__} saved {saved_count} new objs')
+        logger.info(f'{cls.__name__} saved {writer.inserted} new objs')
+        logger.info(f'{cls.__name__} updated {writer.updated} objs')
+        logger.info(f'{cls.__name__} skipped {cache.skipped} pages')
+        logger.info(f'{cls.__name__} {cls.get_limiter().summary()}')
         logger.info(f'{cls.__name__} stop scraping')
 
 
@@ -387,6 +844,7 @@ class RoshydrometScraper(GismeteoScraper):
     base_url: str = env.get(
         'ROSHYDROMET_URL', 'https://www.meteorf.gov.ru/product/weather'
     )
+    verify: bool = False
 
     @classmethod
     def get_objects(cls) -> manager.BaseManager[GeoObject]:
@@ -397,13 +855,39 @@ class RoshydrometScraper(GismeteoScraper):
         return f'{cls.base_url}/{geo_object.roshydromet_id}/'
 
     @classmethod
-    def get_data(cls, geo_object: GeoObject) -> str:
+    async def get_data(
+        cls,
+        client: httpx.AsyncClient,
+        geo_object: GeoObject,
+        cache: PageCache,
+    ) -> Optional[str]:
         url = cls.get_url(geo_object)
 
-        response = httpx.get(url=url, verify=False)
+        await cls.get_limiter().acquire_async()
+        response = await client.get(url=url, headers=cache.get_headers(url))
 
         if response.is_error:
             raise httpx.HTTPError(
                 f'{response.status_code} {response.reason_phrase}')
 
+        if not cache.is_modified(url, response):
+            return None
+
         return response.text
+
+    @classmethod
+    def parse_content(
+        cls, content: str, date: dt.date, target: Optional[int] = None
+    ) -> list[WeatherBase]:
+        return cls.parser.parse(content, today=date)
+
+
+SCRAPERS: dict[str, type[AbstractScraper]] = {
+    scraper.__name__: scraper for scraper in (
+        RushydroScraper,
+        EbvuScraper,
+        RP5Scraper,
+        GismeteoScraper,
+        RoshydrometScraper,
+    )
+}
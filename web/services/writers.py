@@ -0,0 +1,500 @@
+import csv
+import datetime as dt
+import io
+import time
+from collections import defaultdict
+from os import environ as env
+from typing import Iterable, Optional
+
+import numpy as np
+from celery.utils.log import get_task_logger
+from django.db import DatabaseError, connection, models, transaction
+from django.utils import timezone
+
+from reservoirs.models import Reservoir, WaterSituation
+from services.schemes import Situation, WeatherBase
+from tasks.models import Checkpoint, IngestionState
+from weather.models import GeoObject, Weather
+
+logger = get_task_logger(__name__)
+
+
+def get_watermarks(source: str, targets: Iterable[int]) -> dict[int, dt.date]:
+    return dict(
+        IngestionState.objects.filter(
+            source=source,
+            target__in=list(targets),
+            last_date__isnull=False,
+        ).values_list(
+            'target', 'last_date'
+        )
+    )
+
+
+def seed_watermark(source: str, target: int, date: dt.date):
+    IngestionState.objects.get_or_create(
+        source=source, target=target, defaults={'last_date': date}
+    )
+
+
+def get_contiguous_date(
+    last_date: Optional[dt.date],
+    checkpoints: Iterable[tuple[dt.date, dt.date]],
+) -> Optional[dt.date]:
+    for start, end in sorted(checkpoints):
+        if last_date is not None:
+            if start > last_date + dt.timedelta(days=1):
+                break
+
+            if end <= last_date:
+                continue
+
+        last_date = end
+
+    return last_date
+
+
+def get_checkpoints(
+    source: str, target: int
+) -> list[tuple[dt.date, dt.date]]:
+    return list(
+        Checkpoint.objects.filter(
+            source=source, target=target
+        ).values_list(
+            'start', 'end'
+        )
+    )
+
+
+def is_checkpointed(
+    checkpoints: Iterable[tuple[dt.date, dt.date]],
+    start: dt.date,
+    end: dt.date,
+) -> bool:
+    return any(first <= start and end <= last for first, last in checkpoints)
+
+
+class UpsertWriter:
+    model: type[models.Model]
+    constraint: str
+    key_fields: tuple[str, ...]
+    value_fields: tuple[str, ...]
+    target_field: str
+    chunk_size: int = 1000
+
+    def __init__(
+        self,
+        chunk_size: Optional[int] = None,
+        source: Optional[str] = None,
+        contiguous: bool = False,
+    ):
+        if chunk_size is not None:
+            self.chunk_size = chunk_size
+
+        self.source = source
+        self.contiguous = contiguous
+        self.started_at = time.monotonic()
+        self.rows: dict[tuple, dict] = {}
+        self.blocks: list[tuple[dict[str, list], dict[int, dt.date]]] = []
+        self.block_rows = 0
+        self.checkpoints: list[tuple[int, dt.date, dt.date, int]] = []
+        self.chunk_rows = 0
+        self.counts: dict[int, list[int]] = defaultdict(lambda: [0, 0])
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    @property
+    def saved(self) -> int:
+        return self.inserted + self.updated
+
+    def add_row(self, row: dict):
+        key = tuple(row[field] for field in self.key_fields)
+        self.rows[key] = row
+        self.chunk_rows += 1
+
+        if len(self.rows) >= self.chunk_size:
+            self.flush()
+
+    @staticmethod
+    def to_python(column: np.ndarray) -> list:
+        if column.dtype.kind == 'f':
+            return np.where(np.isnan(column), None, column).tolist()
+        return column.tolist()
+
+    def add_columns(self, columns: dict[str, np.ndarray], **constants):
+        size = len(next(iter(columns.values())))
+
+        for start in range(0, size, self.chunk_size):
+            self.add_block(
+                {
+                    name: column[start:start + self.chunk_size]
+                    for name, column in columns.items()
+                },
+                constants,
+            )
+
+    def add_block(self, columns: dict[str, np.ndarray], constants: dict):
+        size = len(next(iter(columns.values())))
+        block = {}
+
+        for name in (*self.key_fields, *self.value_fields):
+            if name in columns:
+                block[name] = self.to_python(columns[name])
+            else:
+                field = self.model._meta.get_field(name)
+                value = field.get_db_prep_save(constants.get(name), connection)
+                block[name] = [value] * size
+
+        self.blocks.append(
+            (block, self.get_column_last_dates(columns, constants))
+        )
+        self.block_rows += size
+        self.chunk_rows += size
+
+        if len(self.rows) + self.block_rows >= self.chunk_size:
+            self.flush()
+
+    @classmethod
+    def get_table(cls) -> str:
+        return connection.ops.quote_name(cls.model._meta.db_table)
+
+    @classmethod
+    def get_columns(cls, fields: Iterable[str]) -> list[str]:
+        return [
+            connection.ops.quote_name(cls.model._meta.get_field(f).column)
+            for f in fields
+        ]
+
+    def get_conflict_sql(self) -> str:
+        table = self.get_table()
+        values = self.get_columns(self.value_fields)
+        target, = self.get_columns([self.target_field])
+
+        updates = ', '.join(
+            f'{c} = COALESCE(EXCLUDED.{c}, {table}.{c})' for c in values
+        )
+        current = ', '.join(f'{table}.{c}' for c in values)
+        excluded = ', '.join(
+            f'COALESCE(EXCLUDED.{c}, {table}.{c})' for c in values
+        )
+
+        return (
+            f'ON CONFLICT ON CONSTRAINT {self.constraint} '
+            f'DO UPDATE SET {updates} '
+            f'WHERE ({current}) IS DISTINCT FROM ({excluded}) '
+            f'RETURNING (xmax = 0), {table}.{target}'
+        )
+
+    def get_sql(self, rows_count: int) -> str:
+        columns = self.get_columns((*self.key_fields, *self.value_fields))
+        placeholders = '({})'.format(', '.join(['%s'] * len(columns)))
+
+        return (
+            f'INSERT INTO {self.get_table()} ({", ".join(columns)}) '
+            f'VALUES {", ".join([placeholders] * rows_count)} '
+            f'{self.get_conflict_sql()}'
+        )
+
+    def get_merge_sql(self, source: str, last: str = 'ctid') -> str:
+        columns = ', '.join(
+            self.get_columns((*self.key_fields, *self.value_fields))
+        )
+        keys = ', '.join(self.get_columns(self.key_fields))
+
+        return (
+            f'INSERT INTO {self.get_table()} ({columns}) '
+            f'SELECT DISTINCT ON ({keys}) {columns} FROM {source} '
+            f'ORDER BY {keys}, {last} DESC '
+            f'{self.get_conflict_sql()}'
+        )
+
+    def get_columns_sql(self) -> str:
+        fields = (*self.key_fields, *self.value_fields)
+        arrays = ', '.join(
+            f'%s::{self.model._meta.get_field(f).db_type(connection)}[]'
+            for f in fields
+        )
+        columns = ', '.join(self.get_columns(fields))
+
+        return self.get_merge_sql(
+            f'unnest({arrays}) WITH ORDINALITY '
+            f'AS batch ({columns}, row_number)',
+            last='row_number',
+        )
+
+    def get_params(self, rows: Iterable[dict]) -> list:
+        fields = [
+            self.model._meta.get_field(f)
+            for f in (*self.key_fields, *self.value_fields)
+        ]
+        return [
+            field.get_db_prep_save(row.get(field.attname), connection)
+            for row in rows for field in fields
+        ]
+
+    @staticmethod
+    def to_date(value) -> dt.date:
+        if isinstance(value, np.datetime64):
+            value = value.astype('datetime64[D]').item()
+
+        if isinstance(value, dt.datetime):
+            return value.date()
+
+        return value
+
+    def get_last_dates(
+        self, targets: Iterable[int], dates: Iterable
+    ) -> dict[int, dt.date]:
+        last_dates = {}
+
+        for target, date in zip(targets, dates):
+            date = self.to_date(date)
+
+            if target not in last_dates or last_dates[target] < date:
+                last_dates[target] = date
+
+        return last_dates
+
+    def get_column_last_dates(
+        self, columns: dict[str, np.ndarray], constants: dict
+    ) -> dict[int, dt.date]:
+        if self.target_field in columns:
+            return self.get_last_dates(
+                columns[self.target_field], columns['date']
+            )
+
+        return {
+            constants[self.target_field]: self.to_date(columns['date'].max())
+        }
+
+    @staticmethod
+    def merge_last_dates(
+        last_dates: dict[int, dt.date], other: dict[int, dt.date]
+    ):
+        for target, date in other.items():
+            if target not in last_dates or last_dates[target] < date:
+                last_dates[target] = date
+
+    @staticmethod
+    def get_counts(results: list[tuple[bool, int]]) -> dict[int, list[int]]:
+        counts = defaultdict(lambda: [0, 0])
+
+        for inserted, target in results:
+            counts[target][0 if inserted else 1] += 1
+
+        return counts
+
+    def count(self, results: list[tuple[bool, int]]) -> tuple[int, int]:
+        for target, (inserted, updated) in self.get_counts(results).items():
+            self.counts[target][0] += inserted
+            self.counts[target][1] += updated
+
+        inserted = sum(inserted for inserted, _ in results)
+        self.inserted += inserted
+        self.updated += len(results) - inserted
+
+        return inserted, len(results) - inserted
+
+    def save_states(
+        self,
+        last_dates: dict[int, dt.date],
+        results: list[tuple[bool, int]],
+    ):
+        if not self.source:
+            return
+
+        counts = self.get_counts(results)
+        now = timezone.now()
+
+        for target, last_date in last_dates.items():
+            state, _ = IngestionState.objects.select_for_update(
+            ).get_or_create(
+                source=self.source, target=target
+            )
+
+            if not self.contiguous and (
+                state.last_date is None or state.last_date < last_date
+            ):
+                state.last_date = last_date
+
+            state.last_run_at = now
+            state.duration = time.monotonic() - self.started_at
+            state.inserted_count = self.counts[target][0] + counts[target][0]
+            state.updated_count = self.counts[target][1] + counts[target][1]
+            state.save()
+
+    def add_checkpoint(self, target: int, start: dt.date, end: dt.date):
+        self.checkpoints.append((target, start, end, self.chunk_rows))
+        self.chunk_rows = 0
+        self.flush()
+
+    def save_checkpoints(
+        self, checkpoints: list[tuple[int, dt.date, dt.date, int]]
+    ):
+        if not self.source:
+            return
+
+        for target, start, end, rows in checkpoints:
+            Checkpoint.objects.update_or_create(
+                source=self.source,
+                target=target,
+                start=start,
+                end=end,
+                defaults={'rows': rows},
+            )
+
+        if self.contiguous:
+            for target in {target for target, *_ in checkpoints}:
+                self.advance_watermark(target)
+
+    def advance_watermark(self, target: int):
+        state, _ = IngestionState.objects.select_for_update().get_or_create(
+            source=self.source, target=target
+        )
+        last_date = get_contiguous_date(
+            state.last_date, get_checkpoints(self.source, target)
+        )
+
+        if last_date != state.last_date:
+            state.last_date = last_date
+            state.save(update_fields=['last_date'])
+
+    @classmethod
+    def to_text(cls, column: np.ndarray) -> list:
+        if column.dtype.kind == 'M':
+            return np.datetime_as_string(
+                column, unit='s', timezone='UTC'
+            ).tolist()
+        return cls.to_python(column)
+
+    def copy(
+        self, columns: dict[str, np.ndarray], **constants
+    ) -> tuple[int, int]:
+        fields = (*self.key_fields, *self.value_fields)
+        size = len(next(iter(columns.values())))
+        values = [
+            self.to_text(columns[field]) if field in columns
+            else [constants.get(field)] * size
+            for field in fields
+        ]
+
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(zip(*values))
+        buffer.seek(0)
+
+        staging = connection.ops.quote_name(
+            f'{self.model._meta.db_table}_staging'
+        )
+
+        last_dates = self.get_column_last_dates(columns, constants)
+        self.chunk_rows += size
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'CREATE TEMP TABLE {staging} ON COMMIT DROP AS '
+                    f'SELECT {", ".join(self.get_columns(fields))} '
+                    f'FROM {self.get_table()} WITH NO DATA'
+                )
+                cursor.copy_expert(
+                    f'COPY {staging} ({", ".join(self.get_columns(fields))}) '
+                    f'FROM STDIN WITH (FORMAT csv)',
+                    buffer,
+                )
+                cursor.execute(self.get_merge_sql(staging))
+                results = cursor.fetchall()
+
+            self.save_states(last_dates, results)
+
+        return self.count(results)
+
+    def write(self, rows: list[dict]) -> list[tuple[bool, int]]:
+        with connection.cursor() as cursor:
+            cursor.execute(self.get_sql(len(rows)), self.get_params(rows))
+            return cursor.fetchall()
+
+    def write_columns(
+        self, block: dict[str, list]
+    ) -> list[tuple[bool, int]]:
+        with connection.cursor() as cursor:
+            cursor.execute(self.get_columns_sql(), list(block.values()))
+            return cursor.fetchall()
+
+    def flush(self) -> tuple[int, int]:
+        if not self.rows and not self.blocks and not self.checkpoints:
+            return 0, 0
+
+        rows = list(self.rows.values())
+        self.rows.clear()
+
+        blocks, self.blocks = self.blocks, []
+        size = len(rows) + self.block_rows
+        self.block_rows = 0
+
+        checkpoints = self.checkpoints
+        self.checkpoints = []
+
+        last_dates = self.get_last_dates(
+            (row[self.target_field] for row in rows),
+            (row['date'] for row in rows),
+        )
+        for _, block_dates in blocks:
+            self.merge_last_dates(last_dates, block_dates)
+
+        try:
+            with transaction.atomic():
+                results = self.write(rows) if rows else []
+
+                for block, _ in blocks:
+                    results += self.write_columns(block)
+
+                self.save_states(last_dates, results)
+                self.save_checkpoints(checkpoints)
+
+        except DatabaseError as error:
+            logger.error(f'{self.__class__.__name__} {repr(error)}')
+            self.failed += size
+            return 0, 0
+
+        return self.count(results)
+
+
+class SituationWriter(UpsertWriter):
+    model = WaterSituation
+    constraint = 'water_situation_date_reservoir_id_key'
+    key_fields = ('date', 'reservoir_id')
+    target_field = 'reservoir_id'
+    value_fields = ('level', 'free_capacity', 'inflow',
+                    'outflow', 'spillway')
+
+    def add(self, situation: Situation, reservoir: Reservoir):
+        row = situation.dict()
+        row['reservoir_id'] = reservoir.id
+        self.add_row(row)
+
+    def add_series(
+        self, columns: dict[str, np.ndarray], reservoir: Reservoir
+    ):
+        self.add_columns(columns, reservoir_id=reservoir.id)
+
+
+class WeatherWriter(UpsertWriter):
+    model = Weather
+    constraint = 'date_geo_object_is_observable_unique'
+    key_fields = ('date', 'geo_object_id', 'is_observable')
+    target_field = 'geo_object_id'
+    value_fields = ('temp', 'pressure', 'humidity', 'cloudiness',
+                    'wind_speed', 'precipitation')
+    chunk_size = int(env.get('WEATHER_CHUNK_SIZE', 1000))
+
+    def add(self, forecast: WeatherBase, geo_object: GeoObject):
+        row = forecast.dict()
+        row['geo_object_id'] = geo_object.id
+        self.add_row(row)
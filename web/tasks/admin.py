@@ -0,0 +1,36 @@
+from django.contrib import admin
+
+from .models import ArchivedPage, Checkpoint, FetchState, IngestionState
+
+
+class MixinAdmin(admin.ModelAdmin):
+    empty_value_display = '-пусто-'
+
+
+@admin.register(FetchState)
+class FetchStateAdmin(MixinAdmin):
+    list_display = ('id', 'source', 'url', 'fetch_count', 'skip_count',
+                    'fetched_at', 'checked_at')
+    list_filter = ('source', )
+    search_fields = ('url', )
+
+
+@admin.register(ArchivedPage)
+class ArchivedPageAdmin(MixinAdmin):
+    list_display = ('id', 'source', 'date', 'target', 'size', 'fetched_at')
+    list_filter = ('source', )
+    search_fields = ('url', 'content_hash')
+
+
+@admin.register(IngestionState)
+class IngestionStateAdmin(MixinAdmin):
+    list_display = ('id', 'source', 'target', 'last_date', 'last_run_at',
+                    'duration', 'inserted_count', 'updated_count')
+    list_filter = ('source', )
+
+
+@admin.register(Checkpoint)
+class CheckpointAdmin(MixinAdmin):
+    list_display = ('id', 'source', 'target', 'start', 'end', 'rows',
+                    'completed_at')
+    list_filter = ('source', )
@@ -0,0 +1,27 @@
+import datetime as dt
+
+from django.core.management.base import BaseCommand
+
+from services.leases import get_leases
+
+
+class Command(BaseCommand):
+    help = 'Список активных блокировок задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument('pattern', nargs='?', default='*')
+
+    def handle(self, *args, **options):
+        leases = get_leases(options['pattern'])
+
+        for lease in leases:
+            acquired_at = dt.datetime.fromtimestamp(lease['acquired_at'])
+            self.stdout.write(
+                f'{lease["name"]}: {lease["owner"]} '
+                f'task {lease["task_id"]}, since {acquired_at:%d.%m %H:%M}, '
+                f'{lease["renewals"]} renewals, ttl {lease["ttl"]:.0f}s'
+                + (', pending rerun' if lease['pending'] else '')
+            )
+
+        if not leases:
+            self.stdout.write('Нет активных блокировок')
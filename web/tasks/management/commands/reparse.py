@@ -0,0 +1,65 @@
+import datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from typing import Any, Optional
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from services.archive import PageArchive
+from services.scrapers import SCRAPERS
+from tasks.models import ArchivedPage
+
+
+def parse_archived_page(
+    source: str, path: str, date: dt.date, target: Optional[int]
+) -> Any:
+    content = PageArchive.read(path)
+    return SCRAPERS[source].parse_content(content, date, target)
+
+
+class Command(BaseCommand):
+    help = 'Повторный разбор сохраненных страниц за период'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', choices=sorted(SCRAPERS))
+        parser.add_argument('--start', type=dt.date.fromisoformat)
+        parser.add_argument('--end', type=dt.date.fromisoformat)
+        parser.add_argument('--workers', type=int, default=cpu_count())
+
+    def handle(self, *args, **options):
+        source = options['source']
+        scraper = SCRAPERS[source]
+
+        pages = ArchivedPage.objects.filter(source=source)
+
+        if options['start']:
+            pages = pages.filter(date__gte=options['start'])
+
+        if options['end']:
+            pages = pages.filter(date__lte=options['end'])
+
+        pages = list(pages.order_by('fetched_at'))
+
+        if not pages:
+            raise CommandError('Нет сохраненных страниц за период')
+
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            results = executor.map(
+                parse_archived_page,
+                [source] * len(pages),
+                [page.path for page in pages],
+                [page.date for page in pages],
+                [page.target for page in pages],
+            )
+
+            with scraper.get_writer() as writer:
+                for page, parsed in zip(pages, results):
+                    scraper.save_content(writer, parsed, target=page.target)
+
+        self.stdout.write(
+            f'{source}: {len(pages)} pages, {writer.inserted} inserted, '
+            f'{writer.updated} updated, {writer.failed} failed'
+        )
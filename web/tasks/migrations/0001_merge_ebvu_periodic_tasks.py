@@ -0,0 +1,49 @@
+from django.db import migrations
+from django.utils import timezone
+
+EBVU_TASKS = (
+    'tasks.tasks.run_kras_parsing',
+    'tasks.tasks.run_sayan_parsing',
+    'tasks.tasks.run_mainsk_parsing',
+    'tasks.tasks.run_irkutsk_parsing',
+    'tasks.tasks.run_bratsk_parsing',
+    'tasks.tasks.run_ust_ilim_parsing',
+    'tasks.tasks.run_boguchan_parsing',
+)
+
+
+def merge_ebvu_periodic_tasks(apps, schema_editor):
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    PeriodicTasks = apps.get_model('django_celery_beat', 'PeriodicTasks')
+
+    periodic_tasks = PeriodicTask.objects.filter(
+        task__in=EBVU_TASKS
+    ).order_by(
+        '-enabled', 'id'
+    )
+    periodic_task = periodic_tasks.first()
+
+    if periodic_task is None:
+        return
+
+    periodic_tasks.exclude(pk=periodic_task.pk).delete()
+
+    periodic_task.task = 'tasks.tasks.run_ebvu_parsing'
+    periodic_task.save(update_fields=['task'])
+
+    PeriodicTasks.objects.update_or_create(
+        ident=1, defaults={'last_update': timezone.now()}
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_celery_beat', '0018_improve_crontab_helptext'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_ebvu_periodic_tasks, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.0.6 on 2026-10-18 10:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_merge_ebvu_periodic_tasks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FetchState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=64, verbose_name='Источник')),
+                ('url', models.CharField(max_length=512, unique=True, verbose_name='URL')),
+                ('etag', models.CharField(blank=True, max_length=256, null=True, verbose_name='ETag')),
+                ('last_modified', models.CharField(blank=True, max_length=64, null=True, verbose_name='Last-Modified')),
+                ('content_hash', models.CharField(blank=True, max_length=64, null=True, verbose_name='Хэш содержимого')),
+                ('fetched_at', models.DateTimeField(blank=True, null=True, verbose_name='Время последнего изменения')),
+                ('checked_at', models.DateTimeField(blank=True, null=True, verbose_name='Время последней проверки')),
+                ('fetch_count', models.PositiveIntegerField(default=0, verbose_name='Обработано')),
+                ('skip_count', models.PositiveIntegerField(default=0, verbose_name='Пропущено без изменений')),
+            ],
+            options={
+                'verbose_name': 'Состояние страницы источника',
+                'verbose_name_plural': 'Состояния страниц источников',
+            },
+        ),
+    ]
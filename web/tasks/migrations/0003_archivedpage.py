@@ -0,0 +1,34 @@
+# Generated by Django 4.0.6 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_fetchstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=64, verbose_name='Источник')),
+                ('url', models.CharField(max_length=512, verbose_name='URL')),
+                ('date', models.DateField(verbose_name='Дата данных')),
+                ('target', models.PositiveIntegerField(blank=True, null=True, verbose_name='ID объекта')),
+                ('fetched_at', models.DateTimeField(auto_now_add=True, verbose_name='Время загрузки')),
+                ('content_hash', models.CharField(db_index=True, max_length=64, verbose_name='Хэш содержимого')),
+                ('size', models.PositiveIntegerField(help_text='Размер страницы до сжатия в байтах', verbose_name='Размер')),
+            ],
+            options={
+                'verbose_name': 'Архивная страница',
+                'verbose_name_plural': 'Архивные страницы',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedpage',
+            index=models.Index(fields=['source', 'date'], name='archived_page_source_date_idx'),
+        ),
+    ]
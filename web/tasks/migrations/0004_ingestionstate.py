@@ -0,0 +1,34 @@
+# Generated by Django 4.0.6 on 2026-10-18 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_archivedpage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=64, verbose_name='Источник')),
+                ('target', models.PositiveIntegerField(verbose_name='ID объекта')),
+                ('last_date', models.DateField(blank=True, null=True, verbose_name='Последняя загруженная дата')),
+                ('last_run_at', models.DateTimeField(blank=True, null=True, verbose_name='Время последней загрузки')),
+                ('duration', models.FloatField(default=0, help_text='Длительность последней загрузки в секундах', verbose_name='Длительность загрузки')),
+                ('inserted_count', models.PositiveIntegerField(default=0, verbose_name='Добавлено')),
+                ('updated_count', models.PositiveIntegerField(default=0, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Состояние загрузки',
+                'verbose_name_plural': 'Состояния загрузки',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ingestionstate',
+            constraint=models.UniqueConstraint(fields=('source', 'target'), name='ingestion_state_source_target_key'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.0.6 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_ingestionstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Checkpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=64, verbose_name='Источник')),
+                ('target', models.PositiveIntegerField(verbose_name='ID объекта')),
+                ('start', models.DateField(verbose_name='Начало периода')),
+                ('end', models.DateField(verbose_name='Конец периода')),
+                ('rows', models.PositiveIntegerField(default=0, verbose_name='Записей')),
+                ('completed_at', models.DateTimeField(auto_now=True, verbose_name='Время завершения')),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка загрузки',
+                'verbose_name_plural': 'Контрольные точки загрузки',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='checkpoint',
+            constraint=models.UniqueConstraint(fields=('source', 'target', 'start', 'end'), name='checkpoint_source_target_chunk_key'),
+        ),
+    ]
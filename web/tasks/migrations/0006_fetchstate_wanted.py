@@ -0,0 +1,24 @@
+# Generated by Django 4.0.6 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+def delete_wanted_keys(apps, schema_editor):
+    FetchState = apps.get_model('tasks', 'FetchState')
+    FetchState.objects.filter(url__contains='#').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fetchstate',
+            name='wanted',
+            field=models.CharField(blank=True, help_text='Объекты и даты, для которых разобрана страница', max_length=512, null=True, verbose_name='Запрошенные объекты'),
+        ),
+        migrations.RunPython(delete_wanted_keys, migrations.RunPython.noop),
+    ]
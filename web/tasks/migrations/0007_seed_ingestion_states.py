@@ -0,0 +1,66 @@
+from django.db import migrations
+from django.db.models import Max
+
+EBVU_SLUGS = (
+    'kras', 'sayano', 'mainsk', 'irkutsk', 'bratsk', 'ust-ilim', 'boguch'
+)
+
+
+def seed_ingestion_states(apps, schema_editor):
+    IngestionState = apps.get_model('tasks', 'IngestionState')
+    WaterSituation = apps.get_model('reservoirs', 'WaterSituation')
+    Weather = apps.get_model('weather', 'Weather')
+
+    situations = WaterSituation.objects.filter(
+        reservoir__slug__in=EBVU_SLUGS
+    ).values(
+        'reservoir_id'
+    ).annotate(
+        last_date=Max('date')
+    ).values_list(
+        'reservoir_id', 'last_date'
+    )
+    observations = Weather.objects.filter(
+        geo_object__station_id__isnull=False,
+        is_observable=True,
+    ).values(
+        'geo_object_id'
+    ).annotate(
+        last_date=Max('date')
+    ).values_list(
+        'geo_object_id', 'last_date'
+    )
+
+    last_dates = [
+        ('EbvuScraper', target, last_date)
+        for target, last_date in situations
+    ] + [
+        ('RP5Scraper', target, last_date.date())
+        for target, last_date in observations
+    ]
+
+    for source, target, last_date in last_dates:
+        state, created = IngestionState.objects.get_or_create(
+            source=source, target=target, defaults={'last_date': last_date}
+        )
+
+        if not created and (
+            state.last_date is None or state.last_date < last_date
+        ):
+            state.last_date = last_date
+            state.save(update_fields=['last_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_fetchstate_wanted'),
+        ('reservoirs', '0008_reservoir_geo_objects'),
+        ('weather', '0007_geoobject_roshydromet_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            seed_ingestion_states, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,198 @@
+from django.db import models
+
+
+class FetchState(models.Model):
+    source = models.CharField(
+        verbose_name='Источник',
+        max_length=64,
+    )
+    url = models.CharField(
+        verbose_name='URL',
+        max_length=512,
+        unique=True,
+    )
+    etag = models.CharField(
+        verbose_name='ETag',
+        max_length=256,
+        blank=True,
+        null=True,
+    )
+    last_modified = models.CharField(
+        verbose_name='Last-Modified',
+        max_length=64,
+        blank=True,
+        null=True,
+    )
+    content_hash = models.CharField(
+        verbose_name='Хэш содержимого',
+        max_length=64,
+        blank=True,
+        null=True,
+    )
+    wanted = models.CharField(
+        verbose_name='Запрошенные объекты',
+        help_text='Объекты и даты, для которых разобрана страница',
+        max_length=512,
+        blank=True,
+        null=True,
+    )
+    fetched_at = models.DateTimeField(
+        verbose_name='Время последнего изменения',
+        blank=True,
+        null=True,
+    )
+    checked_at = models.DateTimeField(
+        verbose_name='Время последней проверки',
+        blank=True,
+        null=True,
+    )
+    fetch_count = models.PositiveIntegerField(
+        verbose_name='Обработано',
+        default=0,
+    )
+    skip_count = models.PositiveIntegerField(
+        verbose_name='Пропущено без изменений',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Состояние страницы источника'
+        verbose_name_plural = 'Состояния страниц источников'
+
+    def __str__(self):
+        return self.url
+
+
+class ArchivedPage(models.Model):
+    source = models.CharField(
+        verbose_name='Источник',
+        max_length=64,
+    )
+    url = models.CharField(
+        verbose_name='URL',
+        max_length=512,
+    )
+    date = models.DateField(
+        verbose_name='Дата данных',
+    )
+    target = models.PositiveIntegerField(
+        verbose_name='ID объекта',
+        blank=True,
+        null=True,
+    )
+    fetched_at = models.DateTimeField(
+        verbose_name='Время загрузки',
+        auto_now_add=True,
+    )
+    content_hash = models.CharField(
+        verbose_name='Хэш содержимого',
+        max_length=64,
+        db_index=True,
+    )
+    size = models.PositiveIntegerField(
+        verbose_name='Размер',
+        help_text='Размер страницы до сжатия в байтах',
+    )
+
+    class Meta:
+        verbose_name = 'Архивная страница'
+        verbose_name_plural = 'Архивные страницы'
+        indexes = [
+            models.Index(
+                fields=['source', 'date'],
+                name='archived_page_source_date_idx',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.source}: {self.date}'
+
+    @property
+    def path(self) -> str:
+        return (
+            f'archive/{self.source}/'
+            f'{self.content_hash[:2]}/{self.content_hash}.zst'
+        )
+
+
+class IngestionState(models.Model):
+    source = models.CharField(
+        verbose_name='Источник',
+        max_length=64,
+    )
+    target = models.PositiveIntegerField(
+        verbose_name='ID объекта',
+    )
+    last_date = models.DateField(
+        verbose_name='Последняя загруженная дата',
+        blank=True,
+        null=True,
+    )
+    last_run_at = models.DateTimeField(
+        verbose_name='Время последней загрузки',
+        blank=True,
+        null=True,
+    )
+    duration = models.FloatField(
+        verbose_name='Длительность загрузки',
+        help_text='Длительность последней загрузки в секундах',
+        default=0,
+    )
+    inserted_count = models.PositiveIntegerField(
+        verbose_name='Добавлено',
+        default=0,
+    )
+    updated_count = models.PositiveIntegerField(
+        verbose_name='Обновлено',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Состояние загрузки'
+        verbose_name_plural = 'Состояния загрузки'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source', 'target'],
+                name='ingestion_state_source_target_key',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.source}: {self.target}'
+
+
+class Checkpoint(models.Model):
+    source = models.CharField(
+        verbose_name='Источник',
+        max_length=64,
+    )
+    target = models.PositiveIntegerField(
+        verbose_name='ID объекта',
+    )
+    start = models.DateField(
+        verbose_name='Начало периода',
+    )
+    end = models.DateField(
+        verbose_name='Конец периода',
+    )
+    rows = models.PositiveIntegerField(
+        verbose_name='Записей',
+        default=0,
+    )
+    completed_at = models.DateTimeField(
+        verbose_name='Время завершения',
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name = 'Контрольная точка загрузки'
+        verbose_name_plural = 'Контрольные точки загрузки'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source', 'target', 'start', 'end'],
+                name='checkpoint_source_target_chunk_key',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.source}: {self.target} {self.start} - {self.end}'
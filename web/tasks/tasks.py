@@ -1,91 +1,229 @@
+import datetime as dt
+import time
+from os import environ as env
+from typing import Optional
+
+from celery import chord, group
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_process_shutdown
 from celery.utils.log import get_task_logger
 from httpx import HTTPError
 
 from web.celery import app
-from services.forecasting import water_situation_forecasting
-from services.parsers import (BoguchanParser, BratskParser, IrkutskParser,
-                              KrasParser, MainskParser, SayanParser,
-                              UstIlimParser)
+from services.browsers import close_pool
+from services.gaps import (SituationGapFinder, WeatherGapFinder,
+                           group_by_month, group_ranges)
+from services.leases import exclusive
 from services.scrapers import (GismeteoScraper, EbvuScraper,
                                RoshydrometScraper, RushydroScraper, RP5Scraper)
 
 logger = get_task_logger(__name__)
 
-
-@app.task(autoretry_for=(HTTPError, ), retry_backoff=20)
-def run_rushydro_parsing():
-    RushydroScraper.scrape()
-    return True
-
-
-@app.task(autoretry_for=(HTTPError, ), retry_backoff=20)
-def run_kras_parsing():
-    parser = KrasParser()
-    EbvuScraper(parser, 'kras').scrape()
-    return True
+RP5_CHUNK_DAYS = int(env.get('RP5_CHUNK_DAYS', 0))
+RP5_TIME_LIMIT = int(env.get('RP5_TIME_LIMIT', 2 * 60 * 60))
+RP5_RUN_BUDGET = int(env.get('RP5_RUN_BUDGET', 6 * 60 * 60))
+RP5_MAX_RESUMES = int(env.get('RP5_MAX_RESUMES', 3))
 
 
-@app.task(autoretry_for=(HTTPError, ), retry_backoff=20)
-def run_sayan_parsing():
-    parser = SayanParser()
-    EbvuScraper(parser, 'sayano').scrape()
-    return True
+@worker_process_shutdown.connect
+def close_browser_sessions(**kwargs):
+    close_pool()
 
 
 @app.task(autoretry_for=(HTTPError, ), retry_backoff=20)
-def run_mainsk_parsing():
-    parser = MainskParser()
-    EbvuScraper(parser, 'mainsk').scrape()
+@exclusive(RushydroScraper.__name__)
+def run_rushydro_parsing():
+    RushydroScraper.scrape()
     return True
 
 
 @app.task(autoretry_for=(HTTPError, ), retry_backoff=20)
-def run_irkutsk_parsing():
-    parser = IrkutskParser()
-    EbvuScraper(parser, 'irkutsk').scrape()
+@exclusive(EbvuScraper.__name__)
+def run_ebvu_parsing():
+    EbvuScraper.scrape()
     return True
 
 
-@app.task(autoretry_for=(HTTPError, ), retry_backoff=20)
-def run_bratsk_parsing():
-    parser = BratskParser()
-    EbvuScraper(parser, 'bratsk').scrape()
-    return True
+@app.task
+def run_rp5_parsing(chunk_days: Optional[int] = None):
+    chunk_days = RP5_CHUNK_DAYS if chunk_days is None else chunk_days
+    subtasks = [
+        run_rp5_geo_object_parsing.s(
+            geo_object_id,
+            start and start.isoformat(),
+            end and end.isoformat(),
+        )
+        for geo_object_id, start, end in RP5Scraper.scrape(chunk_days)
+    ]
+
+    if not subtasks:
+        return 0
+
+    chord(subtasks)(log_rp5_throughput.s(time.time()))
+    return len(subtasks)
+
+
+@exclusive(
+    lambda geo_object_id, start=None, end=None, **kwargs:
+    f'{RP5Scraper.__name__}:{geo_object_id}:{start}:{end}'
+)
+def scrape_rp5_geo_object(
+    geo_object_id: int,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    resume: bool = False,
+) -> dict:
+    return RP5Scraper.scrape_geo_object(
+        geo_object_id,
+        start=start and dt.date.fromisoformat(start),
+        end=end and dt.date.fromisoformat(end),
+        resume=resume,
+        interrupts=(SoftTimeLimitExceeded, ),
+    )
+
+
+@app.task(
+    bind=True,
+    soft_time_limit=RP5_TIME_LIMIT,
+    time_limit=RP5_TIME_LIMIT + 5 * 60,
+    max_retries=RP5_MAX_RESUMES,
+)
+def run_rp5_geo_object_parsing(
+    self,
+    geo_object_id: int,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    deadline: Optional[float] = None,
+):
+    deadline = deadline or time.time() + RP5_RUN_BUDGET
+    result = scrape_rp5_geo_object(
+        geo_object_id, start, end, resume=self.request.retries > 0
+    )
+
+    if not result or not result['interrupted']:
+        return result
+
+    budget = int(min(deadline - time.time(), RP5_TIME_LIMIT))
+
+    if self.request.retries < self.max_retries and budget > 0:
+        logger.warning(
+            f'RP5 geo object {geo_object_id} resumes with {budget}s left'
+        )
+        raise self.retry(
+            args=(geo_object_id, start, end),
+            kwargs={'deadline': deadline},
+            countdown=0,
+            soft_time_limit=budget,
+            time_limit=budget + 5 * 60,
+        )
+
+    logger.error(
+        f'RP5 geo object {geo_object_id} stopped after '
+        f'{self.request.retries} resumes'
+    )
+    return result
 
 
-@app.task(autoretry_for=(HTTPError, ), retry_backoff=20)
-def run_ust_ilim_parsing():
-    parser = UstIlimParser()
-    EbvuScraper(parser, 'ust-ilim').scrape()
-    return True
+@app.task
+def log_rp5_throughput(results: list[Optional[dict]], started_at: float):
+    skipped = results.count(None)
+    results = [result for result in results if result]
+    elapsed = time.time() - started_at
+    saved = sum(result['inserted'] + result['updated'] for result in results)
+    requests = sum(result['requests'] for result in results)
+    failed = sum(result['failed'] for result in results)
+    interrupted = sum(result['interrupted'] for result in results)
+    busy = sum(result['seconds'] for result in results)
+
+    logger.info(
+        f'RP5 {len(results)} subtasks ({skipped} skipped) in {elapsed:.1f}s '
+        f'(parallelism {busy / max(elapsed, 1e-3):.1f}): '
+        f'{requests} requests, {saved} rows saved, {failed} failed, '
+        f'{interrupted} interrupted, {saved / max(elapsed, 1e-3):.1f} rows/s'
+    )
+    return {
+        'subtasks': len(results),
+        'skipped': skipped,
+        'requests': requests,
+        'saved': saved,
+        'failed': failed,
+        'interrupted': interrupted,
+        'seconds': elapsed,
+    }
 
 
 @app.task(autoretry_for=(HTTPError, ), retry_backoff=20)
-def run_boguchan_parsing():
-    parser = BoguchanParser()
-    EbvuScraper(parser, 'boguch').scrape()
-    return True
+@exclusive(lambda month, gaps: f'{EbvuScraper.__name__}:{month}')
+def run_ebvu_backfill(month: str, gaps: dict[str, list[str]]):
+    return EbvuScraper.backfill(
+        dt.date.fromisoformat(month),
+        {
+            int(target): [dt.date.fromisoformat(date) for date in dates]
+            for target, dates in gaps.items()
+        },
+    )
 
 
-@app.task(time_limit=2*60*60)
-def run_rp5_parsing():
-    RP5Scraper.scrape()
-    return True
+@app.task
+@exclusive('gap_backfill')
+def run_gap_backfill():
+    reservoirs = EbvuScraper.get_objects().values_list('id', flat=True)
+    situation_gaps = SituationGapFinder.find(
+        reservoirs, start=EbvuScraper.first_date
+    )
+
+    geo_objects = RP5Scraper.get_objects().values_list('id', flat=True)
+    weather_gaps = WeatherGapFinder.find(
+        geo_objects, start=RP5Scraper.first_date
+    )
+
+    subtasks = [
+        run_ebvu_backfill.s(
+            month.isoformat(),
+            {
+                str(target): [date.isoformat() for date in dates]
+                for target, dates in gaps.items()
+            },
+        )
+        for month, gaps in group_by_month(situation_gaps).items()
+    ] + [
+        run_rp5_geo_object_parsing.s(
+            geo_object_id, start.isoformat(), end.isoformat()
+        )
+        for geo_object_id, dates in weather_gaps.items()
+        for start, end in group_ranges(dates, RP5Scraper.range_days)
+    ]
+
+    logger.info(
+        f'Found {sum(map(len, situation_gaps.values()))} situation gaps, '
+        f'{sum(map(len, weather_gaps.values()))} weather gaps, '
+        f'{len(subtasks)} backfill subtasks'
+    )
+
+    if subtasks:
+        group(subtasks).apply_async()
+
+    return len(subtasks)
 
 
 @app.task
+@exclusive(GismeteoScraper.__name__)
 def run_gismeteo_parsing():
     GismeteoScraper.scrape()
     return True
 
 
 @app.task(autoretry_for=(HTTPError, ), retry_backoff=20)
+@exclusive(RoshydrometScraper.__name__)
 def run_roshydromet_parsing():
     RoshydrometScraper.scrape()
     return True
 
 
 @app.task
+@exclusive('water_situation_forecasting', coalesce=True)
 def run_water_situation_forecasting():
+    from services.forecasting import water_situation_forecasting
+
     water_situation_forecasting()
     return True
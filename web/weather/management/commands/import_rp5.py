@@ -0,0 +1,69 @@
+import datetime as dt
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from services.importers import RP5ExportReader
+from services.scrapers import RP5Scraper
+from services.writers import WeatherWriter
+from weather.models import GeoObject
+
+
+class Command(BaseCommand):
+    help = 'Загрузка архива погоды rp5 из файлов выгрузки (CSV/XLS)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('geo_object', help='Слаг географического объекта')
+        parser.add_argument('paths', nargs='+', type=Path)
+        parser.add_argument('--encoding', default='utf-8')
+        parser.add_argument('--chunk-size', type=int)
+
+    @staticmethod
+    def add_checkpoint(
+        writer: WeatherWriter, geo_object: GeoObject, first, last
+    ):
+        # dates are in UTC, the first and last local days may be partial
+        first = writer.to_date(first) + dt.timedelta(days=1)
+        last = writer.to_date(last) - dt.timedelta(days=1)
+
+        if first <= last:
+            writer.add_checkpoint(geo_object.id, first, last)
+
+    def handle(self, *args, **options):
+        try:
+            geo_object = GeoObject.objects.get(slug=options['geo_object'])
+        except GeoObject.DoesNotExist:
+            raise CommandError(f'Нет объекта {options["geo_object"]}')
+
+        writer = RP5Scraper.get_writer()
+        start = time.monotonic()
+        rows = 0
+
+        for path in options['paths']:
+            reader = RP5ExportReader(
+                path,
+                timezone=settings.TIME_ZONE,
+                encoding=options['encoding'],
+                chunk_size=options['chunk_size'],
+            )
+            bounds = []
+
+            for columns in reader:
+                writer.copy(
+                    columns, geo_object_id=geo_object.id, is_observable=True
+                )
+                rows += len(columns['date'])
+                bounds += [columns['date'].min(), columns['date'].max()]
+
+            if bounds:
+                self.add_checkpoint(
+                    writer, geo_object, min(bounds), max(bounds)
+                )
+
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            f'{geo_object}: {rows} rows in {elapsed:.1f}s, '
+            f'{writer.inserted} inserted, {writer.updated} updated'
+        )
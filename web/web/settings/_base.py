@@ -143,6 +143,21 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
+CELERY_TASK_DEFAULT_QUEUE = 'celery'
+
+BROWSER_QUEUE = os.environ.get('CELERY_BROWSER_QUEUE', 'browser')
+HTTP_QUEUE = os.environ.get('CELERY_HTTP_QUEUE', 'http')
+ML_QUEUE = os.environ.get('CELERY_ML_QUEUE', 'ml')
+
+CELERY_TASK_ROUTES = {
+    'tasks.tasks.run_rushydro_parsing': {'queue': BROWSER_QUEUE},
+    'tasks.tasks.run_rp5_geo_object_parsing': {'queue': BROWSER_QUEUE},
+    'tasks.tasks.run_ebvu_parsing': {'queue': HTTP_QUEUE},
+    'tasks.tasks.run_ebvu_backfill': {'queue': HTTP_QUEUE},
+    'tasks.tasks.run_gismeteo_parsing': {'queue': HTTP_QUEUE},
+    'tasks.tasks.run_roshydromet_parsing': {'queue': HTTP_QUEUE},
+    'tasks.tasks.run_water_situation_forecasting': {'queue': ML_QUEUE},
+}
 
 CELERY_BROKER_URL = os.environ['REDIS_URL']
 CELERY_CACHE_BACKEND = 'default'